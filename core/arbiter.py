@@ -1,16 +1,48 @@
 import os
+import hashlib
 import subprocess
 import tempfile
 import litellm
 import json
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 from rich.console import Console
 from cortex import ProjectSpec
 
 
 console = Console()
 
+# Install commands and the manifests (plus install output dir) that determine
+# their result; an install is skipped when these are unchanged since it last passed
+_INSTALL_INPUTS = {
+    "npm install": (("package.json", "package-lock.json"), "node_modules"),
+    "pip install -r requirements.txt": (("requirements.txt",), None),
+}
+
+# Static part of the fix-plan system prompt, built once at import time
+_FIX_PLAN_SYSTEM_PREFIX = """You are OMNI's Arbiter - an expert debugging agent.
+Your role is to analyze build/test failures and produce a STRICT JSON FIX_PLAN.
+
+CRITICAL RULES:
+1. Output ONLY valid JSON, no markdown, no explanations.
+2. Analyze the error carefully and provide actionable fixes.
+3. For file content: NO COMMENTS in JSON files (.json). JSON does not support comments.
+4. For file content: Output raw, valid code - no explanatory comments about changes.
+5. The FIX_PLAN must follow this exact schema:
+{
+  "error_summary": "brief description of the error",
+  "root_cause": "explanation of why this error occurred",
+  "fixes": [
+    {
+      "file_path": "relative/path/to/file.ext",
+      "new_content": "complete corrected file content (entire file, not just changed lines)",
+      "reason": "why this fix is necessary"
+    }
+  ],
+  "additional_commands": ["any commands to run after fixes, e.g., npm install @tanstack/react-query"]
+}
+"""
+
 
 class ArbiterAgent:
     def __init__(self):
@@ -25,6 +57,10 @@ class ArbiterAgent:
             "fastapi": ["pip install -r requirements.txt", "python3 -m pytest"],
         }
 
+        # (target_dir, install command) -> manifest fingerprint of the last passing run,
+        # so repair re-verifications don't reinstall dependencies that didn't change
+        self._install_fingerprints: Dict[Tuple[str, str], str] = {}
+
     def verify_and_refine(self, target_dir: str, spec: ProjectSpec) -> Dict:
         """
         Verifies the built project by running build/test commands.
@@ -44,6 +80,12 @@ class ArbiterAgent:
         commands = self._determine_build_commands(spec)
 
         for command in commands:
+            fingerprint = self._install_fingerprint(command, target_path)
+            install_key = (str(target_path), command)
+            if fingerprint and self._install_fingerprints.get(install_key) == fingerprint:
+                console.print(f"[dim]Skipping (dependencies unchanged):[/dim] {command}\n")
+                continue
+
             console.print(f"[cyan]Running:[/cyan] {command}")
 
             result = self._run_command(command, str(target_path))
@@ -70,6 +112,8 @@ class ArbiterAgent:
                 }
             else:
                 console.print(f"[green]✓ Success[/green]\n")
+                if fingerprint:
+                    self._install_fingerprints[install_key] = fingerprint
 
         console.print(f"[bold green]Arbiter: All verifications passed![/bold green]\n")
         return {
@@ -101,6 +145,27 @@ class ArbiterAgent:
 
         return commands
 
+    def _install_fingerprint(self, command: str, target_path: Path) -> Optional[str]:
+        """
+        Hashes the manifests an install command reads. Returns None for
+        non-install commands, or when the install output is missing.
+        """
+        if command not in _INSTALL_INPUTS:
+            return None
+
+        manifests, output_dir = _INSTALL_INPUTS[command]
+        if output_dir and not (target_path / output_dir).is_dir():
+            return None
+
+        digest = hashlib.sha256()
+        for manifest in manifests:
+            try:
+                digest.update((target_path / manifest).read_bytes())
+            except OSError:
+                pass
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
     def _run_command(self, command: str, cwd: str) -> Dict:
         """
         Runs a shell command and captures stdout, stderr, and exit code.
@@ -148,32 +213,14 @@ class ArbiterAgent:
         """
         console.print("[yellow]Analyzing errors with LLM...[/yellow]")
 
-        system_prompt = f"""You are OMNI's Arbiter - an expert debugging agent.
-Your role is to analyze build/test failures and produce a STRICT JSON FIX_PLAN.
-
-Project: {spec.project_name}
-Tech Stack: {', '.join(spec.tech_stack)}
-Core Features: {', '.join(spec.core_features)}
-
-CRITICAL RULES:
-1. Output ONLY valid JSON, no markdown, no explanations.
-2. Analyze the error carefully and provide actionable fixes.
-3. For file content: NO COMMENTS in JSON files (.json). JSON does not support comments.
-4. For file content: Output raw, valid code - no explanatory comments about changes.
-5. The FIX_PLAN must follow this exact schema:
-{{
-  "error_summary": "brief description of the error",
-  "root_cause": "explanation of why this error occurred",
-  "fixes": [
-    {{
-      "file_path": "relative/path/to/file.ext",
-      "new_content": "complete corrected file content (entire file, not just changed lines)",
-      "reason": "why this fix is necessary"
-    }}
-  ],
-  "additional_commands": ["any commands to run after fixes, e.g., npm install @tanstack/react-query"]
-}}
-"""
+        # Static instructions first, project details last: the prefix is byte-identical
+        # across calls and is never re-interpolated
+        system_prompt = (
+            _FIX_PLAN_SYSTEM_PREFIX
+            + f"\nProject: {spec.project_name}\n"
+            f"Tech Stack: {', '.join(spec.tech_stack)}\n"
+            f"Core Features: {', '.join(spec.core_features)}\n"
+        )
 
         user_prompt = f"""Build command failed:
 Command: {command}
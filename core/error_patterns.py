@@ -0,0 +1,187 @@
+"""
+OMNI Error Pattern Store
+
+Persistent knowledge base of error signatures and the repair strategy that
+fixed them. The error_patterns.json shipped with OMNI is a read-only seed; the
+learned state lives under ~/.omni (overridable with OMNI_ERROR_PATTERNS_PATH).
+Patterns learned from successful repairs are appended to a JSON-Lines journal
+next to the state file (O(1) per save instead of a full read/rewrite) and folded
+into it every `compact_every` appends.
+
+A later journal entry for the same (error_signature, fix_strategy) supersedes
+the earlier one, which is how pattern statistics are updated without rewrites.
+"""
+
+import json
+import os
+import re
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import fast_json
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+SEED_PATTERNS_PATH = Path(__file__).parent / "error_patterns.json"
+
+
+class ErrorPatternStore:
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        seed_path: Optional[Path] = None,
+        compact_every: int = 100,
+    ):
+        """
+        Load the pattern database.
+
+        Args:
+            path: Learned-state JSON file (default: ~/.omni/error_patterns.json,
+                overridable with OMNI_ERROR_PATTERNS_PATH); the journal sits next to it
+            seed_path: Read-only seed patterns (default: error_patterns.json next to this module)
+            compact_every: Number of journal appends between compactions
+        """
+        self.path = Path(
+            path or os.getenv("OMNI_ERROR_PATTERNS_PATH", "~/.omni/error_patterns.json")
+        ).expanduser()
+        self.seed_path = Path(seed_path) if seed_path else SEED_PATTERNS_PATH
+        self.journal_path = self.path.with_suffix(".jsonl")
+        self.compact_every = compact_every
+        self.metadata: Dict = {}
+        self._patterns: Dict[Tuple[str, str], Dict] = {}
+        # Keys learned at runtime (state file or journal); only these are persisted,
+        # so untouched seed patterns always come from the current seed
+        self._learned: Set[Tuple[str, str]] = set()
+        self._appends = 0
+        self._compiled: Dict[str, Optional[re.Pattern]] = {}
+        self._load()
+
+    @property
+    def patterns(self) -> List[Dict]:
+        return list(self._patterns.values())
+
+    def get(self, error_signature: str, fix_strategy: str) -> Optional[Dict]:
+        return self._patterns.get((error_signature, fix_strategy))
+
+    def match(self, text: str) -> List[Dict]:
+        """Returns the patterns whose error_signature (a regex) occurs in `text`"""
+        matches = []
+        for pattern in self._patterns.values():
+            regex = self._compile(pattern.get("error_signature", ""))
+            if regex is not None and regex.search(text):
+                matches.append(pattern)
+        return matches
+
+    def append(self, pattern: Dict):
+        """Records a new or updated pattern with a single journal append"""
+        key = self._key(pattern)
+        self._patterns[key] = pattern
+        self._learned.add(key)
+
+        try:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._locked(self.journal_path, "a") as f:
+                f.write(fast_json.dumps(pattern) + "\n")
+        except OSError:
+            return  # Still usable in-memory for this run
+
+        self._appends += 1
+        if self._appends >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Folds the journal into the learned-state JSON file and truncates it"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._locked(self.journal_path, "a+") as journal:
+                # Pick up entries appended by other processes since we loaded
+                journal.seek(0)
+                self._merge_lines(journal)
+
+                learned = [self._patterns[key] for key in self._learned]
+                self.metadata["total_patterns"] = len(learned)
+                self.metadata["last_updated"] = date.today().isoformat()
+
+                tmp_path = self.path.with_suffix(".json.tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(
+                        fast_json.dumps(
+                            {"patterns": learned, "metadata": self.metadata}, indent=True
+                        )
+                    )
+                    f.write("\n")
+                os.replace(tmp_path, self.path)
+
+                journal.truncate(0)
+        except OSError:
+            return
+
+        self._appends = 0
+
+    def _load(self):
+        # Seed first, then the learned state on top of it, then the journal
+        for path in (self.seed_path, self.path):
+            try:
+                with open(path, "rb") as f:
+                    data = fast_json.loads(f.read())
+            except (OSError, json.JSONDecodeError):
+                continue
+
+            learned = path == self.path
+            self.metadata = data.get("metadata", self.metadata)
+            for pattern in data.get("patterns", []):
+                key = self._key(pattern)
+                # Plain seed copies (written by older versions) are not learned
+                if learned and self._patterns.get(key) != pattern:
+                    self._learned.add(key)
+                self._patterns[key] = pattern
+
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                self._merge_lines(f)
+        except OSError:
+            pass
+
+    def _merge_lines(self, lines):
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                pattern = fast_json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Torn write from a crashed process
+            key = self._key(pattern)
+            self._patterns[key] = pattern
+            self._learned.add(key)
+
+    def _compile(self, signature: str) -> Optional[re.Pattern]:
+        if signature not in self._compiled:
+            try:
+                self._compiled[signature] = re.compile(signature) if signature else None
+            except re.error:
+                self._compiled[signature] = re.compile(re.escape(signature))
+        return self._compiled[signature]
+
+    @staticmethod
+    def _key(pattern: Dict) -> Tuple[str, str]:
+        return pattern.get("error_signature", ""), pattern.get("fix_strategy", "")
+
+    @staticmethod
+    @contextmanager
+    def _locked(path: Path, mode: str) -> Iterator:
+        """Opens a file under an exclusive advisory lock (cross-process safe on POSIX)"""
+        with open(path, mode, encoding="utf-8") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield f
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
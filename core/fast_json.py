@@ -0,0 +1,30 @@
+"""
+OMNI Fast JSON
+
+Thin wrapper that uses orjson (C/SIMD-accelerated) for JSON parsing and
+serialization when it is installed, falling back to the standard library.
+orjson's decode error subclasses json.JSONDecodeError, so callers can keep
+catching the standard exception either way.
+"""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parses a JSON document"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False) -> str:
+    """Serializes to a JSON string (2-space indented if `indent`)"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False)
@@ -0,0 +1,272 @@
+"""
+OMNI LLM Response Cache
+
+Two-level exact-match cache for LLM responses: an in-process LRU in front of a
+SQLite table on disk. Repeated repairs of the same error on the same project
+produce identical prompts, so the second run can skip the LLM round-trip entirely.
+
+Prompts are normalized before hashing (temp-dir sandbox roots, timestamps,
+memory addresses and durations are masked) so that re-runs of the same failure hash
+to the same key even when those volatile details differ.
+
+SemanticPlanCache adds a second, similarity-based layer on top: successful fix
+plans are embedded by their error text in ChromaDB so that paraphrased errors
+(e.g. "No module named 'foo'" vs "ModuleNotFoundError: foo") can reuse them.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    import chromadb
+
+
+# Temp directories that generated projects are built in; only the sandbox root is
+# masked so library paths (e.g. which package's base.py failed) stay distinct
+_TEMP_ROOTS = sorted(
+    {
+        re.escape(tempfile.gettempdir().rstrip("/")),
+        "/tmp",
+        "/var/tmp",
+        r"/var/folders/[\w+-]+/[\w+-]+/T",
+    },
+    key=len,
+    reverse=True,
+)
+
+# Volatile fragments that differ between runs of the same failure
+_NORMALIZERS = [
+    (
+        re.compile(rf"(?<![\w.])(?:/private)?(?:{'|'.join(_TEMP_ROOTS)})/[\w.@+-]+(?=/)"),
+        "<sandbox>",
+    ),
+    (
+        re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:Z|[+-]\d{2}:?\d{2})?"),
+        "<timestamp>",
+    ),
+    (re.compile(r"0x[0-9a-fA-F]{6,}"), "<addr>"),
+    (re.compile(r"\b\d+(?:\.\d+)?\s?(?:ms|s|seconds)\b"), "<duration>"),
+]
+
+
+def normalize_prompt(text: str, root: Optional[str] = None) -> str:
+    """Masks run-specific details so equivalent prompts produce the same cache key"""
+    if root:
+        text = text.replace(root.rstrip("/") + "/", "<sandbox>/")
+    for pattern, replacement in _NORMALIZERS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class LLMResponseCache:
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_entries: int = 1000,
+        ttl_seconds: Optional[int] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            db_path: SQLite file for the persistent layer (default: ~/.omni/llm_cache.db,
+                overridable with OMNI_LLM_CACHE_PATH)
+            max_entries: Maximum entries kept in the in-memory LRU
+            ttl_seconds: Entry lifetime (default: 7 days, overridable with OMNI_LLM_CACHE_TTL)
+        """
+        self.enabled = os.getenv("OMNI_LLM_CACHE", "1") != "0"
+        self.db_path = Path(
+            db_path or os.getenv("OMNI_LLM_CACHE_PATH", "~/.omni/llm_cache.db")
+        ).expanduser()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds or int(os.getenv("OMNI_LLM_CACHE_TTL", str(7 * 24 * 3600)))
+        self._memory: "OrderedDict[str, tuple[str, float]]" = OrderedDict()
+        self._db_ready = False
+
+    @staticmethod
+    def make_key(model: str, *parts: str, root: Optional[str] = None) -> str:
+        """
+        Builds a SHA256 cache key from the model name and normalized prompt parts.
+
+        root is the project directory the prompts refer to; it is masked like a
+        temp-dir sandbox so the same failure in another checkout shares the key.
+        """
+        digest = hashlib.sha256(model.encode())
+        for part in parts:
+            digest.update(b"\x00")
+            digest.update(normalize_prompt(part, root).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached response text, or None on miss/expiry"""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            value, stored_at = entry
+            if now - stored_at <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                return value
+            del self._memory[key]
+
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT response, ts FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+        except (sqlite3.Error, OSError):
+            return None
+
+        if row is None or now - row[1] > self.ttl_seconds:
+            return None
+
+        self._remember(key, row[0], row[1])
+        return row[0]
+
+    def set(self, key: str, value: str):
+        """Stores a response in both cache levels"""
+        if not self.enabled:
+            return
+
+        stored_at = time.time()
+        self._remember(key, value, stored_at)
+
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, response, ts) VALUES (?, ?, ?)",
+                    (key, value, stored_at),
+                )
+        except (sqlite3.Error, OSError):
+            pass  # The in-memory layer still serves this process
+
+    def delete(self, key: str):
+        """Drops an entry (e.g., a plan that failed verification)"""
+        self._memory.pop(key, None)
+
+        if not self.enabled:
+            return
+
+        try:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        except (sqlite3.Error, OSError):
+            pass
+
+    def _remember(self, key: str, value: str, stored_at: float):
+        self._memory[key] = (value, stored_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Opens a connection per operation so the cache is safe to use from worker threads"""
+        if not self._db_ready:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with closing(sqlite3.connect(self.db_path, timeout=5)) as conn:
+            if not self._db_ready:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache "
+                    "(key TEXT PRIMARY KEY, response TEXT NOT NULL, ts REAL NOT NULL)"
+                )
+                self._db_ready = True
+            yield conn
+            conn.commit()
+
+
+class SemanticPlanCache:
+    def __init__(self, path: Optional[str] = None, threshold: float = 0.9):
+        """
+        Initialize the semantic cache (opt-in via OMNI_SEMANTIC_CACHE=1).
+
+        Args:
+            path: ChromaDB storage path (default: OMNI_MEMORY_PATH or .omni_memory)
+            threshold: Minimum cosine similarity for a stored plan to be reused
+        """
+        self.enabled = os.getenv("OMNI_SEMANTIC_CACHE", "0") == "1"
+        self.path = path or os.getenv("OMNI_MEMORY_PATH", "./.omni_memory")
+        self.threshold = threshold
+        self._collection: Optional["chromadb.Collection"] = None
+
+    @staticmethod
+    def _stack_key(tech_stack: List[str]) -> str:
+        return ",".join(sorted(tech.lower() for tech in tech_stack))
+
+    def lookup(self, error_text: str, strategy: str, tech_stack: List[str]) -> Optional[str]:
+        """Returns the closest stored plan for this strategy/stack if similar enough"""
+        if not self.enabled or not error_text:
+            return None
+
+        try:
+            collection = self._get_collection()
+            if collection.count() == 0:
+                return None
+
+            results = collection.query(
+                query_texts=[normalize_prompt(error_text)],
+                n_results=1,
+                where={
+                    "$and": [
+                        {"strategy": strategy},
+                        {"tech_stack": self._stack_key(tech_stack)},
+                    ]
+                },
+            )
+        except Exception:
+            return None
+
+        if not results.get("ids") or not results["ids"][0]:
+            return None
+
+        # Cosine space: distance = 1 - similarity
+        similarity = 1 - results["distances"][0][0]
+        if similarity < self.threshold:
+            return None
+
+        return results["metadatas"][0][0].get("plan")
+
+    def add(self, error_text: str, strategy: str, tech_stack: List[str], plan_text: str):
+        """Stores a fix plan that passed verification"""
+        if not self.enabled or not error_text:
+            return
+
+        normalized = normalize_prompt(error_text)
+        stack_key = self._stack_key(tech_stack)
+        entry_id = hashlib.sha256(f"{strategy}\x00{stack_key}\x00{normalized}".encode()).hexdigest()
+
+        try:
+            self._get_collection().upsert(
+                ids=[entry_id],
+                documents=[normalized],
+                metadatas=[{"strategy": strategy, "tech_stack": stack_key, "plan": plan_text}],
+            )
+        except Exception:
+            pass
+
+    def _get_collection(self) -> "chromadb.Collection":
+        if self._collection is None:
+            # Imported on first use: the semantic cache is opt-in, and chromadb
+            # is heavy to import (or may not be installed at all)
+            import chromadb
+            from chromadb.config import Settings
+
+            client = chromadb.PersistentClient(
+                path=self.path, settings=Settings(anonymized_telemetry=False, allow_reset=True)
+            )
+            self._collection = client.get_or_create_collection(
+                name="omni_repair_plans", metadata={"hnsw:space": "cosine"}
+            )
+        return self._collection
@@ -10,7 +10,7 @@ from rich.panel import Panel
 from rich.table import Table
 from typing import Optional
 from cortex import analyze_intent, ProjectSpec
-from swarm import SwarmAgent
+from swarm import InvalidExecutionPlan, SwarmAgent
 from arbiter import ArbiterAgent
 from devops_agent import DevOpsAgent
 from doc_engine import DocEngine
@@ -118,17 +118,24 @@ async def _create_async(intent: str, stack: str, deploy: bool):
         console.print("[green]✓ Swarm Agent Ready[/green]\n")
 
         # 6. Execute DAG-based construction with RAG context
-        await agent.construct(spec, target_dir=target_dir)
+        try:
+            await agent.construct(spec, target_dir=target_dir)
+        except InvalidExecutionPlan as e:
+            # The plan's DAG can never complete (construct already listed the blocked tasks)
+            console.print(Panel.fit(
+                f"[bold red]✗ INVALID EXECUTION PLAN[/bold red]\n\n{e}\n\n"
+                "Nothing was generated. Re-run the command to get a new plan.",
+                border_style="red"
+            ))
+            sys.exit(1)
 
         # 7. Initialize Arbiter Agent
         console.print("[grey50]Initializing Arbiter Agent...[/grey50]")
         arbiter = ArbiterAgent()
         console.print("[green]✓ Arbiter Agent Ready[/green]\n")
 
-        # 8. Verify and refine (run in executor since arbiter is sync but blocking)
-        loop = asyncio.get_event_loop()
-        verification_result = await loop.run_in_executor(
-            None,
+        # 8. Verify and refine (run in a worker thread since arbiter is sync but blocking)
+        verification_result = await asyncio.to_thread(
             arbiter.verify_and_refine,
             target_dir,
             spec
@@ -175,7 +182,7 @@ async def _create_async(intent: str, stack: str, deploy: bool):
             # Run DevOps and DocEngine in parallel using asyncio.gather()
             await asyncio.gather(
                 devops_agent.generate_iac(spec, target_dir),
-                loop.run_in_executor(None, doc_engine.generate_documentation, spec, target_dir)
+                asyncio.to_thread(doc_engine.generate_documentation, spec, target_dir)
             )
 
         # 11. Generate automated setup script (The Janitor) - ALWAYS RUN
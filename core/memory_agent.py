@@ -13,7 +13,7 @@ This agent maintains project context across the codebase, enabling:
 import os
 import asyncio
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import chromadb
 from chromadb.config import Settings
 from rich.console import Console
@@ -42,9 +42,7 @@ class MemoryAgent:
         """
         self.collection_name = collection_name
 
-        # Run ChromaDB initialization in executor (ChromaDB is synchronous)
-        loop = asyncio.get_event_loop()
-
+        # Run ChromaDB initialization in a worker thread (ChromaDB is synchronous)
         def _init_chromadb():
             # Create persistent ChromaDB client
             client = chromadb.PersistentClient(
@@ -63,7 +61,7 @@ class MemoryAgent:
 
             return client, collection
 
-        self.client, self.collection = await loop.run_in_executor(None, _init_chromadb)
+        self.client, self.collection = await asyncio.to_thread(_init_chromadb)
         console.print(f"[green]✓[/green] Memory initialized: {collection_name}")
 
     async def a_add_document(self, file_path: str, content: str, metadata: dict):
@@ -78,33 +76,47 @@ class MemoryAgent:
             content: Full file content
             metadata: Additional metadata (e.g., {"language": "typescript", "file_type": "api_route"})
         """
+        await self.a_add_documents([(file_path, content, metadata)])
+
+    async def a_add_documents(self, files: List[Tuple[str, str, dict]]):
+        """
+        Add several documents to vector memory in a single batch.
+
+        All chunks of all files go to ChromaDB in one add() call, so they are
+        embedded together instead of in one round-trip per file.
+
+        Args:
+            files: (file_path, content, metadata) tuples, as for a_add_document()
+        """
         if not self.collection:
             raise RuntimeError("Memory not initialized. Call a_init() first.")
 
-        # Chunk the content with overlap for semantic continuity
-        chunks = self._chunk_text(content, chunk_size=500, overlap=50)
-
         # Prepare data for ChromaDB
         documents = []
         metadatas = []
         ids = []
 
-        for i, chunk in enumerate(chunks):
-            chunk_id = f"{file_path}::chunk_{i}"
-            chunk_metadata = {
-                "file_path": file_path,
-                "chunk_index": i,
-                "total_chunks": len(chunks),
-                **metadata
-            }
+        for file_path, content, metadata in files:
+            # Chunk the content with overlap for semantic continuity
+            chunks = self._chunk_text(content, chunk_size=500, overlap=50)
+
+            for i, chunk in enumerate(chunks):
+                chunk_id = f"{file_path}::chunk_{i}"
+                chunk_metadata = {
+                    "file_path": file_path,
+                    "chunk_index": i,
+                    "total_chunks": len(chunks),
+                    **metadata
+                }
 
-            documents.append(chunk)
-            metadatas.append(chunk_metadata)
-            ids.append(chunk_id)
+                documents.append(chunk)
+                metadatas.append(chunk_metadata)
+                ids.append(chunk_id)
 
-        # Add to ChromaDB (run in executor since it's synchronous)
-        loop = asyncio.get_event_loop()
+        if not documents:
+            return
 
+        # Add to ChromaDB (run in a worker thread since it's synchronous)
         def _add_to_chromadb():
             self.collection.add(
                 documents=documents,
@@ -112,7 +124,7 @@ class MemoryAgent:
                 ids=ids
             )
 
-        await loop.run_in_executor(None, _add_to_chromadb)
+        await asyncio.to_thread(_add_to_chromadb)
 
     async def a_retrieve_context(self, query: str, n_results: int = 5) -> str:
         """
@@ -138,9 +150,7 @@ class MemoryAgent:
         if not self.collection:
             raise RuntimeError("Memory not initialized. Call a_init() first.")
 
-        # Query ChromaDB (run in executor since it's synchronous)
-        loop = asyncio.get_event_loop()
-
+        # Query ChromaDB (run in a worker thread since it's synchronous)
         def _query_chromadb():
             results = self.collection.query(
                 query_texts=[query],
@@ -148,7 +158,7 @@ class MemoryAgent:
             )
             return results
 
-        results = await loop.run_in_executor(None, _query_chromadb)
+        results = await asyncio.to_thread(_query_chromadb)
 
         # Extract and concatenate documents
         if results and results.get("documents") and len(results["documents"]) > 0:
@@ -175,8 +185,6 @@ class MemoryAgent:
         if not self.collection:
             raise RuntimeError("Memory not initialized. Call a_init() first.")
 
-        loop = asyncio.get_event_loop()
-
         def _clear_chromadb():
             # Delete and recreate collection
             self.client.delete_collection(name=self.collection_name)
@@ -185,7 +193,7 @@ class MemoryAgent:
                 metadata={"description": f"Vector memory for {self.collection_name} project"}
             )
 
-        await loop.run_in_executor(None, _clear_chromadb)
+        await asyncio.to_thread(_clear_chromadb)
         console.print(f"[yellow]⊙[/yellow] Memory cleared: {self.collection_name}")
 
     def _chunk_text(self, text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
@@ -243,10 +251,8 @@ class MemoryAgent:
         if not self.collection:
             raise RuntimeError("Memory not initialized. Call a_init() first.")
 
-        loop = asyncio.get_event_loop()
-
         def _get_stats():
             count = self.collection.count()
             return {"document_count": count}
 
-        return await loop.run_in_executor(None, _get_stats)
+        return await asyncio.to_thread(_get_stats)
@@ -12,11 +12,55 @@ from pathlib import Path
 from typing import List
 
 
+# Static tail of the swarm task section, appended after the task description
+_SWARM_EXECUTION_REQUIREMENTS = """
+
+---
+
+## EXECUTION REQUIREMENTS:
+
+1. **Code Quality:**
+   - Use TypeScript strict mode. NO `any` types.
+   - Follow Next.js 15 App Router conventions if applicable.
+   - Include proper error handling and validation.
+   - Add descriptive comments for complex logic.
+
+2. **File Output:**
+   - Output ONLY the raw file content.
+   - NO markdown code blocks (no ```typescript or similar).
+   - NO explanatory text before or after the code.
+   - NO comments explaining what you changed (the code itself is the deliverable).
+
+3. **Dependencies:**
+   - If generating package.json, include ALL dependencies from CRITICAL DEPENDENCIES section.
+   - Use specific versions or "latest" for npm packages.
+   - Ensure peer dependencies are compatible.
+
+4. **Integration:**
+   - Your code must work seamlessly with existing project files.
+   - Follow consistent naming conventions with the rest of the project.
+   - Import from correct paths based on project structure.
+
+OUTPUT THE COMPLETE FILE CONTENT NOW:
+"""
+
+
 class PromptAssembler:
     def __init__(self):
         """Initialize the PromptAssembler with the OMNI Manifesto as the core constitution."""
         self.manifesto = self._load_manifesto()
 
+        # The manifesto section opens every swarm prompt; build it once
+        self._swarm_system_section = f"""# SYSTEM INSTRUCTION: OMNI MANIFESTO
+
+{self.manifesto}
+
+---
+
+YOU ARE THE SWARM AGENT - AN EXPERT FULL-STACK ENGINEER OPERATING UNDER THESE PRINCIPLES.
+YOUR OUTPUT WILL BE USED DIRECTLY IN PRODUCTION. THERE IS NO HUMAN REVIEW LOOP.
+"""
+
     def _load_manifesto(self) -> str:
         """Load the OMNI Manifesto from disk."""
         manifesto_path = Path(__file__).parent / "00_MANIFESTO.md"
@@ -58,15 +102,7 @@ class PromptAssembler:
         prompt_sections = []
 
         # Section 1: System Instruction (Manifesto)
-        prompt_sections.append(f"""# SYSTEM INSTRUCTION: OMNI MANIFESTO
-
-{self.manifesto}
-
----
-
-YOU ARE THE SWARM AGENT - AN EXPERT FULL-STACK ENGINEER OPERATING UNDER THESE PRINCIPLES.
-YOUR OUTPUT WILL BE USED DIRECTLY IN PRODUCTION. THERE IS NO HUMAN REVIEW LOOP.
-""")
+        prompt_sections.append(self._swarm_system_section)
 
         # Section 2: Current Project Context
         if project_files:
@@ -102,38 +138,7 @@ FAILURE TO INCLUDE THESE DEPENDENCIES WILL CAUSE BUILD FAILURES.
 """)
 
         # Section 4: Task Description
-        prompt_sections.append(f"""# TASK SPECIFICATION
-
-{task_description}
-
----
-
-## EXECUTION REQUIREMENTS:
-
-1. **Code Quality:**
-   - Use TypeScript strict mode. NO `any` types.
-   - Follow Next.js 15 App Router conventions if applicable.
-   - Include proper error handling and validation.
-   - Add descriptive comments for complex logic.
-
-2. **File Output:**
-   - Output ONLY the raw file content.
-   - NO markdown code blocks (no ```typescript or similar).
-   - NO explanatory text before or after the code.
-   - NO comments explaining what you changed (the code itself is the deliverable).
-
-3. **Dependencies:**
-   - If generating package.json, include ALL dependencies from CRITICAL DEPENDENCIES section.
-   - Use specific versions or "latest" for npm packages.
-   - Ensure peer dependencies are compatible.
-
-4. **Integration:**
-   - Your code must work seamlessly with existing project files.
-   - Follow consistent naming conventions with the rest of the project.
-   - Import from correct paths based on project structure.
-
-OUTPUT THE COMPLETE FILE CONTENT NOW:
-""")
+        prompt_sections.append("# TASK SPECIFICATION\n\n" + task_description + _SWARM_EXECUTION_REQUIREMENTS)
 
         return "\n\n".join(prompt_sections)
 
@@ -0,0 +1,50 @@
+"""
+OMNI Rate Limiter
+
+Proactive token-bucket limiter for LLM API calls. Waiting for capacity before
+sending a request is cheaper than hitting the provider's RPM/TPM limits and
+recovering through blind retries with exponential backoff.
+"""
+
+import asyncio
+import time
+
+
+class AsyncTokenBucket:
+    def __init__(self, rate: int, period: float = 60.0):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate: Tokens replenished per period (also the burst capacity)
+            period: Replenishment period in seconds (default: 60, i.e. per-minute limits)
+        """
+        self.capacity = max(1, rate)
+        self.period = period
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.capacity / self.period
+        )
+        self._updated = now
+
+    async def acquire(self, amount: int = 1):
+        """
+        Waits until `amount` tokens are available and consumes them.
+
+        Requests larger than the bucket capacity are clamped to it so they
+        can still proceed (after draining the bucket) instead of waiting forever.
+        Waiters are served in FIFO order.
+        """
+        amount = min(max(1, amount), self.capacity)
+
+        async with self._lock:
+            self._refill()
+            while self._tokens < amount:
+                await asyncio.sleep((amount - self._tokens) * self.period / self.capacity)
+                self._refill()
+            self._tokens -= amount
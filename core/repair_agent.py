@@ -1,17 +1,204 @@
 import os
+import re
 import json
+import shlex
+from itertools import islice
 import litellm
 import asyncio
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Any, Callable, Dict, Optional, List, Tuple, Union
 from rich.console import Console
 from rich.panel import Panel
 from cortex import ProjectSpec
 from arbiter import ArbiterAgent
 from swarm import SwarmAgent
+from llm_cache import LLMResponseCache, SemanticPlanCache
+from error_patterns import ErrorPatternStore
+from rate_limiter import AsyncTokenBucket
+import fast_json
 
 console = Console()
 
+# Manifests/config files that give the LLM enough context to rewrite a file
+# without breaking its imports or the project's build setup
+_CRITICAL_FILES = [
+    "package.json",
+    "requirements.txt",
+    "tsconfig.json",
+    "next.config.ts",
+    "vite.config.ts",
+    "pytest.ini",
+    "conftest.py",
+    "tests/conftest.py",
+    "prisma/schema.prisma",
+]
+_CRITICAL_FILE_MAX_CHARS = 3000
+_ERROR_EXCERPT_CHARS = 1500
+
+# Error output canonicalization before it is sent to the LLM: color codes are
+# dropped, repeated lines/frames collapsed, and only the last lines kept
+_RE_ANSI = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+_EXCERPT_MAX_LINES = 40
+
+# Critical files as handed between reader, analysis and prompts: manifests are
+# parsed JSON objects, everything else is (truncated) text
+ParsedFile = Union[Dict[str, Any], str]
+CriticalFiles = Dict[str, ParsedFile]
+
+# Dependency-analysis helpers
+_RE_NPM_MAJOR = re.compile(r"(\d+)")
+_RE_REQUIREMENT = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)(?:\[[^\]]*\])?\s*(.*?)\s*(?:#.*)?$")
+# Package-manager install commands that can be merged into a single invocation
+_MERGEABLE_INSTALLS = {("pip", "install"), ("pip3", "install"), ("npm", "install"), ("npm", "i")}
+_RE_PACKAGE_ARG = re.compile(r"^[A-Za-z0-9@.][\w@/.:=<>!~^*,\[\]+-]*$")
+
+# Error signatures recorded in error_patterns.json: the last "XxxError: ..." line
+_RE_ERROR_LINE = re.compile(r"^\s*(?:E\s+)?([\w.]+(?:Error|Exception)\b.*)$", re.MULTILINE)
+_SIGNATURE_MAX_CHARS = 200
+
+# error_patterns.json identifiers for each strategy
+_STRATEGY_KEYS = {
+    "Quick Fixes (Syntax & Imports)": "quick_fixes",
+    "Logic Error Fixes": "logic_fixes",
+    "Test Configuration Fixes": "test_config",
+    "Regenerate Failing Files": "regenerate_files",
+    "Simplify Implementation": "simplify",
+    "Alternative Approach": "alternative",
+    "Minimal Viable Version": "minimal_viable",
+}
+
+# Minimum success_rate for a matched pattern's strategy to be tried first
+_PATTERN_CONFIDENCE = 0.9
+
+# Failing-file extraction
+_RE_PY_FILE = re.compile(r'File "([^"]+\.py)"')
+_RE_ERROR_IN = re.compile(r'(?:Error in|Failed:)\s+(\S+\.py)')
+_STDERR_TAIL_CHARS = 4096
+
+_RE_MISSING_MODULE = re.compile(
+    r"(?:No module named|Cannot find module|Module not found: Can't resolve)\s+['\"]([^'\"]+)['\"]"
+)
+
+# Sampling temperature for strategies that benefit from a different answer
+# (simplify / alternative approach); all other strategies run at 0.0
+_EXPLORATORY_TEMPERATURE = 0.4
+
+# Static system-prompt prefixes for each strategy. Kept byte-identical across
+# calls (project-specific context is appended separately) so providers can
+# serve them from their prompt-prefix cache.
+_FIX_PLAN_SCHEMA = """Return ONLY valid JSON with this schema:
+{
+  "error_summary": "brief description",
+  "root_cause": "why this happened",
+  "fixes": [
+    {
+      "file_path": "relative/path/to/file",
+      "new_content": "complete file content with fix",
+      "reason": "why this fix works"
+    }
+  ],
+  "additional_commands": ["commands to run, e.g., pip install package"]
+}
+"""
+
+_QUICK_FIXES_PREFIX = """You are a debugging expert specializing in QUICK FIXES.
+Focus ONLY on:
+- Missing imports (add to requirements.txt or import statements)
+- Syntax errors (typos, missing colons, wrong indentation)
+- Module name typos
+- Simple type errors
+
+""" + _FIX_PLAN_SCHEMA
+
+_LOGIC_FIXES_PREFIX = """You are a debugging expert specializing in LOGIC ERRORS.
+The syntax is correct but the logic is broken.
+
+Focus on:
+- Wrong variable types (str vs int, dict vs list)
+- Missing null/None checks
+- Incorrect function return types
+- Off-by-one errors
+- Edge case handling
+
+Return ONLY valid JSON with fixes.
+"""
+
+_TEST_CONFIG_PREFIX = """You are a testing expert.
+The APPLICATION code is likely CORRECT. The problem is in TEST CONFIGURATION.
+
+Focus on fixing:
+- conftest.py (database setup, fixtures)
+- Test client initialization
+- Mock/patch configuration
+- Test database connections
+- Async test decorators
+
+DO NOT modify application code. Only fix test setup.
+Return ONLY valid JSON with fixes.
+"""
+
+_REGENERATE_FILES_PREFIX = """You are a code generation expert.
+The current implementation of a file is broken beyond simple fixes.
+
+Task: Generate a NEW, SIMPLER implementation from scratch.
+
+Guidelines:
+- Learn from the error to avoid repeating it
+- Use simpler patterns
+- Fewer dependencies
+- More defensive coding (null checks, try/catch)
+
+Return ONLY valid JSON with the COMPLETE regenerated file.
+"""
+
+_SIMPLIFY_PREFIX = """You are a simplification expert.
+The implementation is TOO COMPLEX and breaking.
+
+Task: Simplify the code dramatically.
+
+Remove:
+- Advanced features that aren't core
+- Complex abstractions
+- Optional functionality
+- Clever optimizations
+
+Keep:
+- Core CRUD operations
+- Basic functionality
+- Simple, obvious patterns
+
+Return ONLY valid JSON. Prioritize WORKING over FEATURE-COMPLETE.
+"""
+
+_ALTERNATIVE_PREFIX = """You are an architecture expert.
+The current approach has failed repeatedly. Try a COMPLETELY DIFFERENT approach.
+
+Consider alternative:
+- Architecture patterns (MVC vs Repository vs Service Layer)
+- Libraries (different ORM, different testing approach)
+- Data flow (sync vs async, pull vs push)
+- File organization
+
+Be creative but pragmatic. Return ONLY valid JSON.
+"""
+
+_MINIMAL_VIABLE_PREFIX = """You are creating a MINIMAL VIABLE VERSION.
+This is the last resort. Priority: CODE THAT COMPILES.
+
+Acceptable compromises:
+- Placeholder functions (pass or return None)
+- Simplified logic (basic validation only)
+- Missing features (user can add later)
+- Hardcoded values where appropriate
+
+Unacceptable:
+- Code that doesn't run
+- Syntax errors
+- Missing critical imports
+
+Return ONLY valid JSON. Generate code that WORKS, even if minimal.
+"""
+
 
 class RepairAgent:
     """
@@ -31,6 +218,34 @@ class RepairAgent:
         self.model = os.getenv("OMNI_MODEL", "gpt-4o")
         self.max_attempts = 7
 
+        # Strategies 1-3 only need the initial error, so their fix plans can be
+        # generated speculatively in parallel while earlier plans are verified
+        self.speculative_strategies = 3
+        self.llm_semaphore = asyncio.Semaphore(int(os.getenv("OMNI_REPAIR_CONCURRENCY", "3")))
+
+        # Proactive provider rate limiting (requests/min and tokens/min)
+        self.rpm_limiter = AsyncTokenBucket(int(os.getenv("OMNI_RPM", "500")))
+        self.tpm_limiter = AsyncTokenBucket(int(os.getenv("OMNI_TPM", "90000")))
+
+        # Exact-match response cache (memory LRU + SQLite) for repeated repairs
+        self.response_cache = LLMResponseCache()
+
+        # Parsed critical files keyed by absolute path -> (mtime_ns, content), so
+        # re-reads of unchanged manifests during one repair session are free
+        self._dep_cache: Dict[str, Tuple[int, ParsedFile]] = {}
+
+        # Prompt fragments computed once per repair() instead of once per strategy
+        self._context_spec: Optional[ProjectSpec] = None
+        self._context: Dict[str, str] = {}
+        self._error_excerpts: Dict[Tuple[int, str], Tuple[Dict, str]] = {}
+        self._project_root: Optional[str] = None
+
+        # Known error patterns; successful repairs are recorded back into it
+        self.pattern_store = ErrorPatternStore()
+
+        # Similarity-based reuse of previously successful plans (OMNI_SEMANTIC_CACHE=1)
+        self.semantic_cache = SemanticPlanCache()
+
         # Progressive repair strategies (ordered by complexity)
         self.strategies = [
             ("Quick Fixes (Syntax & Imports)", self._strategy_quick_fixes),
@@ -69,18 +284,88 @@ class RepairAgent:
         console.print("="*70 + "\n")
 
         current_error = initial_error
+        self._error_excerpts = {}
+        self._project_root = str(Path(target_dir).resolve())
+        self._repair_context(spec)
+
+        # A high-confidence known pattern tells us which strategy fixes this
+        # error, so try that one first instead of walking the ladder to it
+        strategies = self.strategies
+        best = self._lookup_pattern(initial_error)
+        if best and best["confidence"] >= _PATTERN_CONFIDENCE:
+            console.print(
+                f"[dim]Known error pattern ({best['confidence']:.0%} success) → "
+                f"trying {best['strategy_name']} first[/dim]"
+            )
+            strategies = sorted(
+                self.strategies, key=lambda strategy: strategy[0] != best["strategy_name"]
+            )
+
+        # Kick off the independent strategies up front; each result is awaited
+        # in order below, and unused (or in-flight) ones are cancelled on exit
+        speculative = {
+            strategy_name: asyncio.create_task(strategy_func(target_dir, spec, initial_error))
+            for strategy_name, strategy_func in strategies[:self.speculative_strategies]
+        }
 
-        for attempt, (strategy_name, strategy_func) in enumerate(self.strategies, 1):
+        try:
+            return await self._run_strategies(
+                target_dir, spec, current_error, speculative, strategies, best
+            )
+        finally:
+            for task in speculative.values():
+                task.cancel()
+            # Let cancelled LLM calls unwind before returning (no pending-task warnings)
+            await asyncio.gather(*speculative.values(), return_exceptions=True)
+
+    async def _run_strategies(
+        self,
+        target_dir: str,
+        spec: ProjectSpec,
+        current_error: Dict,
+        speculative: Dict[str, "asyncio.Task[Optional[Dict]]"],
+        strategies: List[Tuple[str, Callable]],
+        best: Optional[Dict] = None
+    ) -> Dict:
+        """Applies and verifies each strategy's fix plan in order until one succeeds"""
+        initial_error = current_error
+        # Pre-repair content (None: did not exist) of every file a plan has written
+        originals: Dict[Path, Optional[bytes]] = {}
+
+        for attempt, (strategy_name, strategy_func) in enumerate(strategies, 1):
             console.print(f"\n[cyan]═══ Repair Attempt {attempt}/{self.max_attempts} ═══[/cyan]")
             console.print(f"[yellow]Strategy:[/yellow] {strategy_name}")
 
-            # Apply strategy
-            fix_result = await strategy_func(target_dir, spec, current_error)
+            # Speculative plans were generated from the initial error; otherwise
+            # start reading context and calling the LLM now, overlapping the
+            # semantic cache lookup below instead of waiting for it
+            plan_error = initial_error if strategy_name in speculative else current_error
+            if strategy_name not in speculative:
+                speculative[strategy_name] = asyncio.create_task(
+                    strategy_func(target_dir, spec, current_error)
+                )
+
+            # A previously successful plan for a similar error beats a fresh LLM call
+            fix_result = await self._lookup_semantic_plan(strategy_name, spec, current_error)
+
+            if fix_result is not None:
+                console.print("[dim]Reusing fix plan from a similar past error[/dim]")
+                plan_error = current_error
+                speculative.pop(strategy_name).cancel()
+            else:
+                fix_result = await speculative.pop(strategy_name)
 
             if not fix_result or not fix_result.get("fixes"):
                 console.print(f"[dim]Strategy returned no fixes, trying next...[/dim]")
                 continue
 
+            # Speculative plans were written against the initial files; undo the
+            # edits of earlier failed strategies so they apply to what they saw
+            if plan_error is initial_error and originals:
+                console.print("[dim]Restoring files changed by earlier strategies...[/dim]")
+                await asyncio.to_thread(self._restore_files, originals)
+            await asyncio.to_thread(self._snapshot_files, target_dir, fix_result, originals)
+
             # Apply fixes using SwarmAgent
             console.print(f"[cyan]Applying fixes...[/cyan]")
             self.swarm.apply_fix(fix_result)
@@ -91,7 +376,9 @@ class RepairAgent:
 
             # Re-verify
             console.print(f"[cyan]Re-running verification...[/cyan]")
-            verification_result = self.arbiter.verify_and_refine(target_dir, spec)
+            verification_result = await asyncio.to_thread(
+                self.arbiter.verify_and_refine, target_dir, spec
+            )
 
             if verification_result["status"] == "success":
                 console.print("\n" + "="*70)
@@ -103,6 +390,20 @@ class RepairAgent:
                 ))
                 console.print("="*70 + "\n")
 
+                if best and best["strategy_name"] == strategy_name:
+                    await asyncio.to_thread(self._record_pattern_outcome, best["pattern"], True)
+                else:
+                    await asyncio.to_thread(
+                        self._save_successful_pattern, plan_error, strategy_name, fix_result
+                    )
+                await asyncio.to_thread(
+                    self.semantic_cache.add,
+                    plan_error.get("stderr", ""),
+                    strategy_name,
+                    spec.tech_stack,
+                    fast_json.dumps({k: v for k, v in fix_result.items() if k != "_cache_key"})
+                )
+
                 return {
                     "status": "success",
                     "strategy_used": strategy_name,
@@ -112,6 +413,13 @@ class RepairAgent:
                 console.print(f"[yellow]✗ Strategy failed, continuing...[/yellow]\n")
                 current_error = verification_result
 
+                if best and best["strategy_name"] == strategy_name:
+                    await asyncio.to_thread(self._record_pattern_outcome, best["pattern"], False)
+
+                # Don't serve a plan that is known not to work on the next run
+                if fix_result.get("_cache_key"):
+                    await asyncio.to_thread(self.response_cache.delete, fix_result["_cache_key"])
+
         # All strategies exhausted
         console.print("\n" + "="*70)
         console.print(Panel.fit(
@@ -129,6 +437,39 @@ class RepairAgent:
             "final_error": current_error.get("stderr", "Unknown error")
         }
 
+    @staticmethod
+    def _snapshot_files(
+        target_dir: str, fix_result: Dict, originals: Dict[Path, Optional[bytes]]
+    ):
+        """Records the current content of files a plan is about to write (first write wins)"""
+        for fix in fix_result.get("fixes", []):
+            file_path = fix.get("file_path")
+            if not file_path:
+                continue
+            path = Path(target_dir) / file_path
+            if path in originals:
+                continue
+            try:
+                originals[path] = path.read_bytes()
+            except FileNotFoundError:
+                originals[path] = None
+            except OSError:
+                pass
+
+    @staticmethod
+    def _restore_files(originals: Dict[Path, Optional[bytes]]):
+        """Puts snapshotted files back as they were (removing ones that did not exist)"""
+        for path, content in originals.items():
+            try:
+                if content is None:
+                    path.unlink(missing_ok=True)
+                else:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    path.write_bytes(content)
+            except OSError:
+                pass
+        originals.clear()
+
     async def _strategy_quick_fixes(
         self,
         target_dir: str,
@@ -137,30 +478,10 @@ class RepairAgent:
     ) -> Optional[Dict]:
         """Strategy 1: Fix common quick wins (syntax, imports, typos)"""
 
-        system_prompt = f"""You are a debugging expert specializing in QUICK FIXES.
-Focus ONLY on:
-- Missing imports (add to requirements.txt or import statements)
-- Syntax errors (typos, missing colons, wrong indentation)
-- Module name typos
-- Simple type errors
+        critical_files = await self._read_critical_files(target_dir)
+        dependency_analysis = self._analyze_dependencies(critical_files, error.get('stderr', ''))
 
-Project: {spec.project_name}
-Tech Stack: {', '.join(spec.tech_stack)}
-
-Return ONLY valid JSON with this schema:
-{{
-  "error_summary": "brief description",
-  "root_cause": "why this happened",
-  "fixes": [
-    {{
-      "file_path": "relative/path/to/file",
-      "new_content": "complete file content with fix",
-      "reason": "why this fix works"
-    }}
-  ],
-  "additional_commands": ["commands to run, e.g., pip install package"]
-}}
-"""
+        project_context = self._project_context(spec)
 
         user_prompt = f"""Quick fix this error:
 
@@ -168,15 +489,18 @@ Command: {error.get('command', 'unknown')}
 Exit Code: {error.get('exit_code', 'unknown')}
 
 STDOUT:
-{error.get('stdout', '')[:1500]}
+{self._error_excerpt(error, 'stdout')}
 
 STDERR:
-{error.get('stderr', '')[:1500]}
+{self._error_excerpt(error, 'stderr')}
+
+Dependency analysis:
+{dependency_analysis}
 
 Apply the simplest fix that resolves this error.
 """
 
-        return await self._call_llm(system_prompt, user_prompt)
+        return await self._call_llm(_QUICK_FIXES_PREFIX, project_context, user_prompt)
 
     async def _strategy_logic_fixes(
         self,
@@ -186,21 +510,7 @@ Apply the simplest fix that resolves this error.
     ) -> Optional[Dict]:
         """Strategy 2: Fix logic errors (wrong types, null checks, edge cases)"""
 
-        system_prompt = f"""You are a debugging expert specializing in LOGIC ERRORS.
-The syntax is correct but the logic is broken.
-
-Focus on:
-- Wrong variable types (str vs int, dict vs list)
-- Missing null/None checks
-- Incorrect function return types
-- Off-by-one errors
-- Edge case handling
-
-Project: {spec.project_name}
-Tech Stack: {', '.join(spec.tech_stack)}
-
-Return ONLY valid JSON with fixes.
-"""
+        project_context = self._project_context(spec)
 
         user_prompt = f"""Fix logic errors:
 
@@ -208,15 +518,15 @@ Command: {error.get('command', 'unknown')}
 Exit Code: {error.get('exit_code', 'unknown')}
 
 STDOUT:
-{error.get('stdout', '')[:1500]}
+{self._error_excerpt(error, 'stdout')}
 
 STDERR:
-{error.get('stderr', '')[:1500]}
+{self._error_excerpt(error, 'stderr')}
 
 Analyze the logic carefully and fix the root cause.
 """
 
-        return await self._call_llm(system_prompt, user_prompt)
+        return await self._call_llm(_LOGIC_FIXES_PREFIX, project_context, user_prompt)
 
     async def _strategy_test_config(
         self,
@@ -226,22 +536,7 @@ Analyze the logic carefully and fix the root cause.
     ) -> Optional[Dict]:
         """Strategy 3: Fix test configuration issues"""
 
-        system_prompt = f"""You are a testing expert.
-The APPLICATION code is likely CORRECT. The problem is in TEST CONFIGURATION.
-
-Focus on fixing:
-- conftest.py (database setup, fixtures)
-- Test client initialization
-- Mock/patch configuration
-- Test database connections
-- Async test decorators
-
-Project: {spec.project_name}
-Tech Stack: {', '.join(spec.tech_stack)}
-
-DO NOT modify application code. Only fix test setup.
-Return ONLY valid JSON with fixes.
-"""
+        project_context = self._project_context(spec)
 
         user_prompt = f"""Fix test configuration:
 
@@ -249,15 +544,15 @@ Command: {error.get('command', 'unknown')}
 Exit Code: {error.get('exit_code', 'unknown')}
 
 STDOUT:
-{error.get('stdout', '')[:1500]}
+{self._error_excerpt(error, 'stdout')}
 
 STDERR:
-{error.get('stderr', '')[:1500]}
+{self._error_excerpt(error, 'stderr')}
 
 Fix only the test configuration, not the application logic.
 """
 
-        return await self._call_llm(system_prompt, user_prompt)
+        return await self._call_llm(_TEST_CONFIG_PREFIX, project_context, user_prompt)
 
     async def _strategy_regenerate_files(
         self,
@@ -268,36 +563,24 @@ Fix only the test configuration, not the application logic.
         """Strategy 4: Regenerate failing files from scratch"""
 
         failing_file = self._extract_failing_file(error)
+        critical_files = await self._read_critical_files(target_dir, [failing_file])
 
-        system_prompt = f"""You are a code generation expert.
-The current implementation of a file is broken beyond simple fixes.
-
-Task: Generate a NEW, SIMPLER implementation from scratch.
-
-Guidelines:
-- Learn from the error to avoid repeating it
-- Use simpler patterns
-- Fewer dependencies
-- More defensive coding (null checks, try/catch)
-
-Project: {spec.project_name}
-Tech Stack: {', '.join(spec.tech_stack)}
-Failing file: {failing_file}
-
-Return ONLY valid JSON with the COMPLETE regenerated file.
-"""
+        project_context = self._project_context(spec) + f"Failing file: {failing_file}\n"
 
         user_prompt = f"""Regenerate this failing file from scratch:
 
 File: {failing_file}
 
 Error:
-{error.get('stderr', '')[:1500]}
+{self._error_excerpt(error, 'stderr')}
+
+Current project files:
+{self._format_critical_files(critical_files)}
 
 Generate a simpler, working version that avoids this error.
 """
 
-        return await self._call_llm(system_prompt, user_prompt)
+        return await self._call_llm(_REGENERATE_FILES_PREFIX, project_context, user_prompt)
 
     async def _strategy_simplify(
         self,
@@ -307,37 +590,19 @@ Generate a simpler, working version that avoids this error.
     ) -> Optional[Dict]:
         """Strategy 5: Simplify implementation by removing complexity"""
 
-        system_prompt = f"""You are a simplification expert.
-The implementation is TOO COMPLEX and breaking.
-
-Task: Simplify the code dramatically.
-
-Remove:
-- Advanced features that aren't core
-- Complex abstractions
-- Optional functionality
-- Clever optimizations
-
-Keep:
-- Core CRUD operations
-- Basic functionality
-- Simple, obvious patterns
-
-Project: {spec.project_name}
-Tech Stack: {', '.join(spec.tech_stack)}
-
-Return ONLY valid JSON. Prioritize WORKING over FEATURE-COMPLETE.
-"""
+        project_context = self._project_context(spec)
 
         user_prompt = f"""Simplify this failing code:
 
 Error:
-{error.get('stderr', '')[:1500]}
+{self._error_excerpt(error, 'stderr')}
 
 Remove complexity. Keep only what's necessary for basic functionality.
 """
 
-        return await self._call_llm(system_prompt, user_prompt)
+        return await self._call_llm(
+            _SIMPLIFY_PREFIX, project_context, user_prompt, temperature=_EXPLORATORY_TEMPERATURE
+        )
 
     async def _strategy_alternative(
         self,
@@ -347,33 +612,22 @@ Remove complexity. Keep only what's necessary for basic functionality.
     ) -> Optional[Dict]:
         """Strategy 6: Try completely different implementation approach"""
 
-        system_prompt = f"""You are an architecture expert.
-The current approach has failed repeatedly. Try a COMPLETELY DIFFERENT approach.
-
-Consider alternative:
-- Architecture patterns (MVC vs Repository vs Service Layer)
-- Libraries (different ORM, different testing approach)
-- Data flow (sync vs async, pull vs push)
-- File organization
-
-Project: {spec.project_name}
-Tech Stack: {', '.join(spec.tech_stack)}
-
-Be creative but pragmatic. Return ONLY valid JSON.
-"""
+        project_context = self._project_context(spec)
 
         user_prompt = f"""Current approach failed. Try alternative implementation:
 
 Repeated error:
-{error.get('stderr', '')[:1500]}
+{self._error_excerpt(error, 'stderr')}
 
 Original spec:
-Features: {', '.join(spec.core_features[:3])}
+Features: {self._repair_context(spec)['features']}
 
 Use a different architectural approach that avoids this error pattern.
 """
 
-        return await self._call_llm(system_prompt, user_prompt)
+        return await self._call_llm(
+            _ALTERNATIVE_PREFIX, project_context, user_prompt, temperature=_EXPLORATORY_TEMPERATURE
+        )
 
     async def _strategy_minimal_viable(
         self,
@@ -383,30 +637,12 @@ Use a different architectural approach that avoids this error pattern.
     ) -> Optional[Dict]:
         """Strategy 7: Generate absolute minimum viable version"""
 
-        system_prompt = f"""You are creating a MINIMAL VIABLE VERSION.
-This is the last resort. Priority: CODE THAT COMPILES.
-
-Acceptable compromises:
-- Placeholder functions (pass or return None)
-- Simplified logic (basic validation only)
-- Missing features (user can add later)
-- Hardcoded values where appropriate
-
-Unacceptable:
-- Code that doesn't run
-- Syntax errors
-- Missing critical imports
-
-Project: {spec.project_name}
-Tech Stack: {', '.join(spec.tech_stack)}
-
-Return ONLY valid JSON. Generate code that WORKS, even if minimal.
-"""
+        project_context = self._project_context(spec)
 
         user_prompt = f"""Generate minimal viable version:
 
 Repeated failures:
-{error.get('stderr', '')[:1500]}
+{self._error_excerpt(error, 'stderr')}
 
 Core requirements:
 - Must compile/run without errors
@@ -416,26 +652,294 @@ Core requirements:
 Generate the simplest version that passes verification.
 """
 
-        return await self._call_llm(system_prompt, user_prompt)
+        return await self._call_llm(_MINIMAL_VIABLE_PREFIX, project_context, user_prompt)
+
+    async def _read_critical_files(
+        self,
+        target_dir: str,
+        extra_files: Optional[List[str]] = None
+    ) -> CriticalFiles:
+        """
+        Reads the failing file(s) plus the project's key manifests concurrently.
+
+        Existence checks and reads are each fanned out with asyncio.gather over
+        worker threads, so no disk access blocks the event loop (and any
+        speculative strategies running on it).
+
+        Returns:
+            Mapping of project-relative path -> content. JSON files are parsed
+            into dicts (left as text if invalid); other files are truncated text.
+        """
+        root = Path(target_dir).resolve()
+
+        candidates = []
+        for file_path in [*(extra_files or []), *_CRITICAL_FILES]:
+            full_path = (root / file_path).resolve()
+            # Tracebacks may point outside the project (site-packages, etc.)
+            if not full_path.is_relative_to(root):
+                continue
+            relative = full_path.relative_to(root).as_posix()
+            if relative not in candidates:
+                candidates.append(relative)
+
+        exists = await asyncio.gather(
+            *[asyncio.to_thread((root / path).is_file) for path in candidates]
+        )
+        existing = [path for path, found in zip(candidates, exists) if found]
+
+        contents = await asyncio.gather(
+            *[asyncio.to_thread(self._load_critical_file, root / path) for path in existing],
+            return_exceptions=True
+        )
+
+        return {
+            path: content
+            for path, content in zip(existing, contents)
+            if not isinstance(content, BaseException)
+        }
+
+    def _load_critical_file(self, path: Path) -> ParsedFile:
+        """Reads (and for JSON, parses) a file, reusing the cached result if unchanged"""
+        mtime = path.stat().st_mtime_ns
+        cached = self._dep_cache.get(str(path))
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            if path.suffix == ".json":
+                text = f.read()
+                try:
+                    content = fast_json.loads(text)
+                except json.JSONDecodeError:
+                    content = None
+                if not isinstance(content, dict):
+                    # Broken JSON is itself useful context for the LLM
+                    content = text[:_CRITICAL_FILE_MAX_CHARS]
+            else:
+                content = f.read(_CRITICAL_FILE_MAX_CHARS)
+
+        self._dep_cache[str(path)] = (mtime, content)
+        return content
+
+    @staticmethod
+    def _format_critical_files(critical_files: CriticalFiles) -> str:
+        if not critical_files:
+            return "(none found)"
+
+        sections = []
+        for path, content in critical_files.items():
+            if not isinstance(content, str):
+                content = fast_json.dumps(content, indent=True)[:_CRITICAL_FILE_MAX_CHARS]
+            sections.append(f"--- {path} ---\n{content}")
+        return "\n\n".join(sections)
+
+    def _analyze_dependencies(self, critical_files: CriticalFiles, stderr: str = "") -> str:
+        """
+        Flags dependency problems from the parsed manifests in one pass over
+        the declared packages: mismatched React/@types majors, packages declared
+        twice with different versions, and modules the error says are missing
+        but that no manifest declares.
+        """
+        findings = []
+        declared = set()
+
+        pkg = critical_files.get("package.json")
+        if isinstance(pkg, dict):
+            versions: Dict[str, str] = {}
+            for section in ("dependencies", "devDependencies"):
+                entries = pkg.get(section)
+                if not isinstance(entries, dict):
+                    continue  # Missing or malformed section
+                for name, spec_str in entries.items():
+                    declared.add(name)
+                    if name in versions and versions[name] != spec_str:
+                        findings.append(
+                            f"{name} is declared twice with different versions "
+                            f"({versions[name]} vs {spec_str})"
+                        )
+                    versions.setdefault(name, spec_str)
+
+            majors = {
+                name: int(match.group(1))
+                for name, spec_str in versions.items()
+                if (match := _RE_NPM_MAJOR.search(str(spec_str)))
+            }
+            react = majors.get("react")
+            if react is not None:
+                for companion in ("react-dom", "@types/react", "@types/react-dom"):
+                    if companion in majors and majors[companion] != react:
+                        findings.append(
+                            f"{companion} {versions[companion]} does not match "
+                            f"react {versions['react']} (major versions differ)"
+                        )
+
+        requirements = critical_files.get("requirements.txt")
+        if isinstance(requirements, str):
+            pins: Dict[str, str] = {}
+            for line in requirements.splitlines():
+                match = _RE_REQUIREMENT.match(line)
+                if not match or line.lstrip().startswith(("#", "-")):
+                    continue
+                name = match.group(1).lower().replace("_", "-")
+                declared.add(name)
+                if name in pins and pins[name] != match.group(2):
+                    findings.append(
+                        f"requirements.txt pins {name} twice ({pins[name] or 'any'} vs "
+                        f"{match.group(2) or 'any'})"
+                    )
+                pins.setdefault(name, match.group(2))
+
+        for module in set(_RE_MISSING_MODULE.findall(stderr)):
+            if module.startswith((".", "/", "@/")):
+                continue  # Local import, not a package
+            package = module if module.startswith("@") else module.split("/")[0].split(".")[0]
+            if package not in declared and package.replace("_", "-").lower() not in declared:
+                findings.append(f"'{package}' is imported but not declared in any manifest")
+
+        if not findings:
+            return "No dependency conflicts detected."
+        return "\n".join(f"- {finding}" for finding in findings)
+
+    async def _lookup_semantic_plan(
+        self,
+        strategy_name: str,
+        spec: ProjectSpec,
+        error: Dict
+    ) -> Optional[Dict]:
+        """Returns a stored plan whose error is semantically close to this one, if any"""
+        plan_text = await asyncio.to_thread(
+            self.semantic_cache.lookup, error.get("stderr", ""), strategy_name, spec.tech_stack
+        )
+        if plan_text is None:
+            return None
 
-    async def _call_llm(self, system_prompt: str, user_prompt: str) -> Optional[Dict]:
-        """Helper to call LLM and parse JSON response"""
         try:
-            response = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: litellm.completion(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    temperature=0.3,
-                    response_format={"type": "json_object"}
-                )
-            )
+            return fast_json.loads(plan_text)
+        except json.JSONDecodeError:
+            return None
+
+    def _repair_context(self, spec: ProjectSpec) -> Dict[str, str]:
+        """Spec-derived prompt fragments, built once per spec and shared by all strategies"""
+        if self._context_spec is not spec:
+            self._context_spec = spec
+            self._context = {
+                "project": f"""
+Project: {spec.project_name}
+Tech Stack: {', '.join(spec.tech_stack)}
+""",
+                "features": ", ".join(islice(spec.core_features, 3)),
+            }
+        return self._context
+
+    def _project_context(self, spec: ProjectSpec) -> str:
+        """Dynamic, project-specific tail appended after a strategy's static prefix"""
+        return self._repair_context(spec)["project"]
+
+    def _error_excerpt(self, error: Dict, field: str) -> str:
+        """Canonical, truncated stdout/stderr of an error, computed once per error per repair"""
+        key = (id(error), field)
+        cached = self._error_excerpts.get(key)
+        # Holding the error in the entry keeps its id from being reused
+        if cached is not None and cached[0] is error:
+            return cached[1]
+
+        # The tail holds the final exception line, so truncate from the front
+        excerpt = self._canonicalize_output(error.get(field, ''))[-_ERROR_EXCERPT_CHARS:]
+        self._error_excerpts[key] = (error, excerpt)
+        return excerpt
+
+    def _canonicalize_output(self, text: str) -> str:
+        """
+        Compacts build/test output for prompts: strips ANSI color codes, makes
+        paths under the project root relative, collapses consecutive repeats of
+        a line or a two-line traceback frame, and keeps the last lines only.
+        """
+        text = _RE_ANSI.sub("", text)
+        if self._project_root:
+            text = text.replace(self._project_root + "/", "")
+
+        lines = [line.rstrip() for line in text.splitlines() if line.strip()]
+
+        collapsed: List[str] = []
+        i = 0
+        while i < len(lines):
+            for width in (1, 2):
+                block = lines[i:i + width]
+                repeats = 1
+                while lines[i + repeats * width:i + (repeats + 1) * width] == block:
+                    repeats += 1
+                if len(block) == width and repeats > 1:
+                    collapsed.extend(block)
+                    collapsed.append(f"[previous {width} line(s) repeated {repeats - 1} more times]")
+                    i += width * repeats
+                    break
+            else:
+                collapsed.append(lines[i])
+                i += 1
+
+        return "\n".join(collapsed[-_EXCERPT_MAX_LINES:])
+
+    def _supports_prompt_caching(self) -> bool:
+        """Anthropic models need explicit cache_control markers; OpenAI caches prefixes automatically"""
+        model = self.model.lower()
+        return "claude" in model or model.startswith("anthropic/")
+
+    def _build_system_message(self, system_prefix: str, project_context: str) -> Dict:
+        """Builds the system message with the static prefix first so it stays cacheable"""
+        if self._supports_prompt_caching():
+            return {
+                "role": "system",
+                "content": [
+                    {"type": "text", "text": system_prefix, "cache_control": {"type": "ephemeral"}},
+                    {"type": "text", "text": project_context},
+                ]
+            }
+        return {"role": "system", "content": system_prefix + project_context}
+
+    async def _call_llm(
+        self,
+        system_prefix: str,
+        project_context: str,
+        user_prompt: str,
+        temperature: float = 0.0
+    ) -> Optional[Dict]:
+        """
+        Helper to call LLM and parse JSON response (served from cache when possible).
+
+        Fault repair is deterministic by default (temperature 0.0), which also keeps
+        cached responses representative of what the model would answer again.
+        """
+        cache_key = self.response_cache.make_key(
+            f"{self.model}@{temperature}", system_prefix, project_context, user_prompt,
+            root=self._project_root
+        )
+
+        try:
+            fix_plan_text = await asyncio.to_thread(self.response_cache.get, cache_key)
+
+            if fix_plan_text is not None:
+                console.print("[dim]Using cached fix plan[/dim]")
+            else:
+                messages = [
+                    self._build_system_message(system_prefix, project_context),
+                    {"role": "user", "content": user_prompt}
+                ]
+
+                async with self.llm_semaphore:
+                    await self.rpm_limiter.acquire()
+                    await self.tpm_limiter.acquire(
+                        self._estimate_tokens(system_prefix, project_context, user_prompt)
+                    )
+                    fix_plan_text = await self._stream_fix_plan(messages, temperature)
 
-            fix_plan_text = response.choices[0].message.content.strip()
-            fix_plan = json.loads(fix_plan_text)
+                if fix_plan_text is None:
+                    return None
+
+            fix_plan = fast_json.loads(fix_plan_text)
+
+            if fix_plan.get("fixes"):
+                await asyncio.to_thread(self.response_cache.set, cache_key, fix_plan_text)
+                fix_plan["_cache_key"] = cache_key
 
             return fix_plan
 
@@ -443,42 +947,248 @@ Generate the simplest version that passes verification.
             console.print(f"[red]Error calling LLM: {str(e)}[/red]")
             return None
 
+    def _estimate_tokens(self, *texts: str) -> int:
+        """Prompt token estimate for TPM limiting (falls back to ~4 chars/token)"""
+        text = "".join(texts)
+        try:
+            return litellm.token_counter(model=self.model, text=text)
+        except Exception:
+            return len(text) // 4
+
+    async def _stream_fix_plan(self, messages: List[Dict], temperature: float = 0.0) -> Optional[str]:
+        """
+        Streams the completion and abandons it as soon as the output is clearly
+        not a fix plan (prose instead of a JSON object), so repair() can move on
+        without waiting for the full generation. Key order is not checked: not
+        every strategy shows the model the schema, and plans that open with other
+        keys (e.g. "analysis") are still usable if they carry "fixes".
+        """
+        stream = await litellm.acompletion(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            response_format={"type": "json_object"},
+            stream=True
+        )
+
+        chunks = []
+        validated = False
+
+        try:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                chunks.append(delta)
+
+                if validated:
+                    continue
+
+                head = "".join(chunks).lstrip()
+                if head:
+                    if not head.startswith("{"):
+                        console.print("[yellow]LLM response is not a JSON object, aborting early[/yellow]")
+                        return None
+                    validated = True
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+        return "".join(chunks).strip()
+
     async def _run_commands(self, commands: List[str], cwd: str):
-        """Run additional commands (e.g., pip install)"""
-        import subprocess
+        """Run additional commands (e.g., pip install) without blocking the event loop"""
+        for cmd, originals in self._coalesce_commands(commands):
+            if await self._run_command(cmd, cwd) or len(originals) == 1:
+                continue
+
+            # One bad package fails a merged install as a whole; don't let it
+            # block the valid ones
+            console.print("[dim]Retrying merged installs one by one...[/dim]")
+            for original in originals:
+                await self._run_command(original, cwd)
+
+    async def _run_command(self, cmd: str, cwd: str) -> bool:
+        """Runs one shell command (120s timeout) and reports whether it succeeded"""
+        console.print(f"[cyan]Running:[/cyan] {cmd}")
+
+        process = await asyncio.create_subprocess_shell(
+            cmd,
+            cwd=cwd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+
+        try:
+            await asyncio.wait_for(process.communicate(), timeout=120)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            console.print(f"[yellow]⚠ Command timed out (continuing)[/yellow]")
+            return False
+
+        if process.returncode == 0:
+            console.print(f"[green]✓ Success[/green]")
+            return True
+
+        console.print(f"[yellow]⚠ Command failed (continuing)[/yellow]")
+        return False
+
+    @staticmethod
+    def _coalesce_commands(commands: List[str]) -> List[Tuple[str, List[str]]]:
+        """
+        Merges consecutive plain package installs ("pip install a", "pip install b")
+        into one invocation. Installs into the same environment can't safely run
+        concurrently, but a single call resolves everything in one pass.
+
+        Returns (command, original commands it replaces) pairs, so a failed merged
+        install can be retried command by command.
+        """
+        merged: List[Tuple[str, List[str]]] = []
+        pending_prefix: Optional[Tuple[str, str]] = None
+        pending_packages: List[str] = []
+        pending_commands: List[str] = []
+
+        def flush():
+            nonlocal pending_prefix, pending_commands
+            if pending_prefix:
+                merged.append((shlex.join([*pending_prefix, *pending_packages]), pending_commands))
+            pending_prefix = None
+            pending_packages.clear()
+            pending_commands = []
 
         for cmd in commands:
-            console.print(f"[cyan]Running:[/cyan] {cmd}")
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                cwd=cwd,
-                capture_output=True,
-                text=True,
-                timeout=120
+            try:
+                # punctuation_chars splits unquoted operators (&&, >, |) into their
+                # own tokens (which then fail _RE_PACKAGE_ARG) while keeping quoted
+                # specifiers like "b>=1" intact
+                lexer = shlex.shlex(cmd, posix=True, punctuation_chars=True)
+                lexer.whitespace_split = True
+                tokens = list(lexer)
+            except ValueError:
+                tokens = []
+
+            prefix = tuple(tokens[:2])
+            packages = tokens[2:]
+            mergeable = (
+                prefix in _MERGEABLE_INSTALLS
+                and packages
+                and all(_RE_PACKAGE_ARG.match(pkg) for pkg in packages)
             )
 
-            if result.returncode == 0:
-                console.print(f"[green]✓ Success[/green]")
-            else:
-                console.print(f"[yellow]⚠ Command failed (continuing)[/yellow]")
+            if not mergeable:
+                flush()
+                merged.append((cmd, [cmd]))
+                continue
+
+            if prefix != pending_prefix:
+                flush()
+                pending_prefix = prefix
+            pending_packages.extend(pkg for pkg in packages if pkg not in pending_packages)
+            pending_commands.append(cmd)
+
+        flush()
+        return merged
+
+    def _save_successful_pattern(self, error: Dict, strategy_name: str, fix_result: Dict):
+        """Records (or reinforces) the error signature -> strategy mapping that just worked"""
+        signature = self._error_signature(error)
+        if not signature:
+            return
+
+        fix_strategy = _STRATEGY_KEYS.get(strategy_name, strategy_name)
+        existing = self.pattern_store.get(signature, fix_strategy)
+
+        if existing:
+            self._record_pattern_outcome(existing, True)
+            return
+
+        pattern = {
+            "error_signature": signature,
+            "category": "learned",
+            "fix_strategy": fix_strategy,
+            "solution": {
+                "description": fix_result.get("root_cause") or fix_result.get("error_summary", ""),
+                "files": [fix.get("file_path") for fix in fix_result.get("fixes", [])],
+                "commands": fix_result.get("additional_commands", []),
+            },
+            "success_rate": 1.0,
+            "confidence": "medium",
+            "times_applied": 1,
+        }
+
+        self.pattern_store.append(pattern)
+
+    def _record_pattern_outcome(self, pattern: Dict, succeeded: bool):
+        """Updates a pattern's times_applied and success_rate after it was applied"""
+        # Seeded patterns carry no count; weigh their success_rate as one application
+        times_applied = pattern.get("times_applied", 1) + 1
+        success_rate = pattern.get("success_rate", 1.0)
+        outcome = 1.0 if succeeded else 0.0
+
+        self.pattern_store.append({
+            **pattern,
+            "times_applied": times_applied,
+            # Online mean over applications
+            "success_rate": round(success_rate + (outcome - success_rate) / times_applied, 4),
+        })
+
+    def _lookup_pattern(self, error: Dict) -> Optional[Dict]:
+        """
+        Finds the most reliable known pattern matching this error.
+
+        Returns:
+            {"strategy_name": str, "confidence": float, "pattern": Dict} or None
+        """
+        stderr = error.get("stderr", "")[-_STDERR_TAIL_CHARS:]
+        if not stderr:
+            return None
+
+        strategy_names = {key: name for name, key in _STRATEGY_KEYS.items()}
+        candidates = [
+            pattern for pattern in self.pattern_store.match(stderr)
+            if pattern.get("fix_strategy") in strategy_names
+        ]
+        if not candidates:
+            return None
+
+        pattern = max(candidates, key=lambda p: p.get("success_rate", 0.0))
+        return {
+            "strategy_name": strategy_names[pattern["fix_strategy"]],
+            "confidence": pattern.get("success_rate", 0.0),
+            "pattern": pattern,
+        }
+
+    @staticmethod
+    def _error_signature(error: Dict) -> str:
+        """Regex-safe signature of an error: its last exception line (or last line)"""
+        stderr = error.get("stderr", "")[-_STDERR_TAIL_CHARS:]
+
+        matches = _RE_ERROR_LINE.findall(stderr)
+        if matches:
+            line = matches[-1]
+        else:
+            lines = [line.strip() for line in stderr.splitlines() if line.strip()]
+            line = lines[-1] if lines else ""
+
+        return re.escape(line.strip()[:_SIGNATURE_MAX_CHARS]).replace("\\ ", " ")
 
     def _extract_failing_file(self, error: Dict) -> str:
         """Extract the file path that's causing the error from stderr"""
-        stderr = error.get('stderr', '')
-
-        # Common patterns in error messages
-        import re
+        # The traceback footer holds the relevant frames; skip scanning huge logs.
+        # The tail may start mid-traceback, so take the last (innermost) match
+        stderr = error.get('stderr', '')[-_STDERR_TAIL_CHARS:]
 
         # Pattern: File "/path/to/file.py", line X
-        match = re.search(r'File "([^"]+\.py)"', stderr)
-        if match:
-            return match.group(1)
+        matches = _RE_PY_FILE.findall(stderr)
+        if matches:
+            return matches[-1]
 
         # Pattern: Error in tests/test_file.py
-        match = re.search(r'(?:Error in|Failed:)\s+([^\s]+\.py)', stderr)
-        if match:
-            return match.group(1)
+        matches = _RE_ERROR_IN.findall(stderr)
+        if matches:
+            return matches[-1]
 
         # Default: return conftest.py as it's often the culprit
         return "tests/conftest.py"
@@ -6,7 +6,7 @@ This script tests the fix without running a full OMNI project generation.
 
 import asyncio
 import psutil
-from swarm import SwarmAgent
+from swarm import SwarmAgent, _concurrency_from_bytes
 
 
 def test_concurrency_calculation():
@@ -35,17 +35,18 @@ def test_concurrency_calculation():
     print()
 
     # Verify logic
+    gib = 1 << 30
     expected = None
-    if available_gb < 2:
+    if mem.available < 2 * gib:
         expected = 1
-    elif available_gb < 4:
+    elif mem.available < 4 * gib:
         expected = 2
-    elif available_gb < 6:
+    elif mem.available < 6 * gib:
         expected = 4
-    elif available_gb < 8:
+    elif mem.available < 8 * gib:
         expected = 6
     else:
-        expected = min(8, int(available_gb / 1.5))
+        expected = min(8, mem.available * 2 // (3 * gib))
 
     print(f"Expected Concurrency: {expected}")
     print(f"Actual Concurrency: {agent.max_concurrent_tasks}")
@@ -70,16 +71,13 @@ def test_concurrency_calculation():
         (10.0, 6, "Very high memory"),
     ]
 
-    from unittest.mock import patch
-
+    # Sizing is a pure function of available RAM, so no agent is needed per scenario
+    lines = []
     for ram_gb, expected_tasks, description in scenarios:
-        with patch('psutil.virtual_memory') as mock_vm:
-            mock_vm.return_value.available = ram_gb * 1024 ** 3
-            mock_vm.return_value.percent = 50
-            
-            test_agent = SwarmAgent()
-            status = "✅" if test_agent.max_concurrent_tasks == expected_tasks else "❌"
-            print(f"  {status} {description} ({ram_gb}GB RAM) → {test_agent.max_concurrent_tasks} tasks")
+        tasks = _concurrency_from_bytes(int(ram_gb * 1024 ** 3))
+        status = "✅" if tasks == expected_tasks else "❌"
+        lines.append(f"  {status} {description} ({ram_gb}GB RAM) → {tasks} tasks")
+    print("\n".join(lines))
 
     print()
     print("=" * 70)
@@ -98,7 +96,7 @@ async def test_semaphore_limiting():
     from unittest.mock import patch
 
     # Create agent with limited concurrency
-    with patch('psutil.virtual_memory') as mock_vm:
+    with patch('psutil.virtual_memory') as mock_vm, patch('swarm._proc_meminfo', return_value=None):
         mock_vm.return_value.available = 4 * 1024 ** 3
         mock_vm.return_value.percent = 50
         agent = SwarmAgent()
@@ -109,23 +107,25 @@ async def test_semaphore_limiting():
     # Track concurrent execution
     max_concurrent = [0]
     current = [0]
+    # Set once the semaphore is saturated; holders wait on it instead of sleeping
+    reached = asyncio.Event()
 
-    async def mock_task(task_id):
+    async def mock_task():
         """Simulate a task with semaphore."""
         async with agent.semaphore:
             current[0] += 1
             if current[0] > max_concurrent[0]:
                 max_concurrent[0] = current[0]
-            
-            print(f"  Task {task_id} running (current: {current[0]})")
-            await asyncio.sleep(0.1)  # Simulate work
+            if current[0] >= agent.max_concurrent_tasks:
+                reached.set()
+            await reached.wait()  # Simulate work
             current[0] -= 1
 
     print("Launching 10 tasks (should limit to concurrency setting)...")
-    print()
 
-    tasks = [mock_task(i) for i in range(10)]
-    await asyncio.gather(*tasks)
+    async with asyncio.TaskGroup() as tg:
+        for _ in range(10):
+            tg.create_task(mock_task())
 
     print()
     print(f"Results:")
@@ -0,0 +1,7 @@
+"""Shared pytest setup: make the flat core modules (swarm, cortex, ...) importable once."""
+import sys
+from pathlib import Path
+
+CORE_DIR = str(Path(__file__).parent.parent)
+if CORE_DIR not in sys.path:
+    sys.path.insert(0, CORE_DIR)
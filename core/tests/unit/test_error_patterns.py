@@ -0,0 +1,93 @@
+"""Unit tests for the error pattern store (seed + learned state + journal)."""
+import json
+
+import pytest
+
+from error_patterns import ErrorPatternStore
+
+
+def _pattern(signature, strategy="quick_fixes", rate=1.0):
+    return {"error_signature": signature, "fix_strategy": strategy, "success_rate": rate}
+
+
+@pytest.fixture
+def seed(tmp_path):
+    path = tmp_path / "seed.json"
+    path.write_text(json.dumps({
+        "patterns": [_pattern("ModuleNotFoundError", rate=0.9)],
+        "metadata": {"version": "1.0"},
+    }))
+    return path
+
+
+@pytest.fixture
+def state(tmp_path):
+    return tmp_path / "omni" / "error_patterns.json"
+
+
+class TestErrorPatternStore:
+    def test_loads_seed(self, seed, state):
+        store = ErrorPatternStore(path=state, seed_path=seed)
+        assert store.get("ModuleNotFoundError", "quick_fixes")["success_rate"] == 0.9
+        assert store.metadata == {"version": "1.0"}
+
+    def test_journal_entry_supersedes_earlier_one(self, seed, state):
+        store = ErrorPatternStore(path=state, seed_path=seed)
+        store.append(_pattern("ModuleNotFoundError", rate=0.5))
+        store.append(_pattern("ModuleNotFoundError", rate=0.7))
+
+        reloaded = ErrorPatternStore(path=state, seed_path=seed)
+        assert reloaded.get("ModuleNotFoundError", "quick_fixes")["success_rate"] == 0.7
+        assert len(reloaded.patterns) == 1
+
+    def test_compaction_writes_state_not_seed(self, seed, state):
+        seed_before = seed.read_text()
+        store = ErrorPatternStore(path=state, seed_path=seed, compact_every=2)
+        store.append(_pattern("TypeError"))
+        store.append(_pattern("KeyError"))
+
+        assert seed.read_text() == seed_before
+        assert store.journal_path.read_text() == ""
+        data = json.loads(state.read_text())
+        assert {p["error_signature"] for p in data["patterns"]} == {"TypeError", "KeyError"}
+        assert data["metadata"]["total_patterns"] == 2
+
+        reloaded = ErrorPatternStore(path=state, seed_path=seed)
+        assert reloaded.get("KeyError", "quick_fixes") is not None
+
+    def test_updated_seed_wins_for_untouched_patterns(self, seed, state):
+        store = ErrorPatternStore(path=state, seed_path=seed, compact_every=1)
+        store.append(_pattern("TypeError"))
+        assert state.exists()
+
+        seed.write_text(json.dumps({"patterns": [_pattern("ModuleNotFoundError", rate=0.95)]}))
+        reloaded = ErrorPatternStore(path=state, seed_path=seed)
+        assert reloaded.get("ModuleNotFoundError", "quick_fixes")["success_rate"] == 0.95
+        assert reloaded.get("TypeError", "quick_fixes") is not None
+
+    def test_learned_update_of_seed_pattern_is_persisted(self, seed, state):
+        store = ErrorPatternStore(path=state, seed_path=seed, compact_every=1)
+        store.append(_pattern("ModuleNotFoundError", rate=0.5))
+
+        reloaded = ErrorPatternStore(path=state, seed_path=seed)
+        assert reloaded.get("ModuleNotFoundError", "quick_fixes")["success_rate"] == 0.5
+
+    def test_skips_torn_journal_lines(self, seed, state):
+        state.parent.mkdir(parents=True)
+        state.with_suffix(".jsonl").write_text(
+            json.dumps(_pattern("TypeError")) + "\n\n" + '{"error_signature": "Key'
+        )
+        store = ErrorPatternStore(path=state, seed_path=seed)
+        assert store.get("TypeError", "quick_fixes") is not None
+        assert len(store.patterns) == 2
+
+    def test_match_falls_back_to_literal_on_invalid_regex(self, seed, state):
+        store = ErrorPatternStore(path=state, seed_path=seed)
+        store.append(_pattern("Unexpected token ("))
+        store.append(_pattern(r"Cannot find module '\w+'"))
+
+        matched = store.match("SyntaxError: Unexpected token ( at line 3")
+        assert [p["error_signature"] for p in matched] == ["Unexpected token ("]
+        assert [p["error_signature"] for p in store.match("Cannot find module 'zod'")] == [
+            r"Cannot find module '\w+'"
+        ]
@@ -0,0 +1,172 @@
+"""Unit tests for the LLM response cache (prompt normalization, LRU, TTL, SQLite)."""
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import llm_cache
+from llm_cache import LLMResponseCache, SemanticPlanCache, normalize_prompt
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.delenv("OMNI_LLM_CACHE", raising=False)
+    return LLMResponseCache(db_path=str(tmp_path / "cache.db"), max_entries=2, ttl_seconds=60)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    return now
+
+
+class TestNormalizePrompt:
+    def test_masks_volatile_fragments(self):
+        text = (
+            "at /tmp/omni-abc123/src/app.py line 3 on 2024-05-01T12:30:45.123Z "
+            "object at 0x7f3a2b1c4d50 took 1.25s"
+        )
+        assert normalize_prompt(text) == (
+            "at <sandbox>/src/app.py line 3 on <timestamp> object at <addr> took <duration>"
+        )
+
+    def test_equivalent_prompts_share_a_key(self):
+        a = LLMResponseCache.make_key("m", "Error in /tmp/omni-run1/tests/test_a.py after 12ms")
+        b = LLMResponseCache.make_key(
+            "m", "Error in /private/var/folders/xy/k3_z/T/omni-run2/tests/test_a.py after 340ms"
+        )
+        assert a == b
+
+    def test_project_root_is_masked(self):
+        a = LLMResponseCache.make_key("m", "Error in /home/a/proj/app.py", root="/home/a/proj")
+        b = LLMResponseCache.make_key("m", "Error in /srv/b/proj/app.py", root="/srv/b/proj/")
+        assert a == b
+        assert a != LLMResponseCache.make_key("m", "Error in /home/a/proj/app.py")
+
+    def test_library_paths_are_not_masked(self):
+        django = "File \"/usr/lib/python3/site-packages/django/db/models/base.py\", line 10"
+        sqlalchemy = "File \"/usr/lib/python3/site-packages/sqlalchemy/orm/base.py\", line 10"
+        assert normalize_prompt(django) == django
+        assert LLMResponseCache.make_key("m", django) != LLMResponseCache.make_key("m", sqlalchemy)
+
+    def test_different_prompts_get_different_keys(self):
+        base = LLMResponseCache.make_key("m", "sys", "NameError: name 'foo' is not defined")
+        assert base != LLMResponseCache.make_key("m", "sys", "NameError: name 'bar' is not defined")
+        assert base != LLMResponseCache.make_key("other", "sys", "NameError: name 'foo' is not defined")
+        # Parts are delimited, so moving text across the boundary changes the key
+        assert LLMResponseCache.make_key("m", "ab", "c") != LLMResponseCache.make_key("m", "a", "bc")
+        # Line numbers, file names and plain numbers are not masked
+        assert LLMResponseCache.make_key("m", "src/a.py:10") != LLMResponseCache.make_key("m", "src/a.py:11")
+        assert LLMResponseCache.make_key("m", "/x/a.py") != LLMResponseCache.make_key("m", "/x/b.py")
+
+
+class TestLLMResponseCache:
+    def test_miss_then_hit(self, cache, clock):
+        assert cache.get("k") is None
+        cache.set("k", "plan")
+        assert cache.get("k") == "plan"
+
+    def test_persists_across_instances(self, cache, clock, tmp_path):
+        cache.set("k", "plan")
+        fresh = LLMResponseCache(db_path=str(tmp_path / "cache.db"), ttl_seconds=60)
+        assert fresh.get("k") == "plan"
+
+    def test_entries_expire(self, cache, clock, tmp_path):
+        cache.set("k", "plan")
+        clock[0] += 61
+        assert cache.get("k") is None
+        fresh = LLMResponseCache(db_path=str(tmp_path / "cache.db"), ttl_seconds=60)
+        assert fresh.get("k") is None
+
+    def test_memory_layer_evicts_least_recently_used(self, cache, clock):
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+        assert list(cache._memory) == ["a", "c"]
+        # Evicted entries are still served from SQLite
+        assert cache.get("b") == "2"
+
+    def test_delete_removes_both_levels(self, cache, clock, tmp_path):
+        cache.set("k", "plan")
+        cache.delete("k")
+        assert cache.get("k") is None
+        fresh = LLMResponseCache(db_path=str(tmp_path / "cache.db"), ttl_seconds=60)
+        assert fresh.get("k") is None
+
+    def test_disabled_by_env(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("OMNI_LLM_CACHE", "0")
+        cache = LLMResponseCache(db_path=str(tmp_path / "cache.db"))
+        cache.set("k", "plan")
+        assert cache.get("k") is None
+        assert not (tmp_path / "cache.db").exists()
+
+
+class FakeCollection:
+    """Stands in for a ChromaDB collection: stores upserts, answers queries with a fixed distance."""
+
+    def __init__(self, distance=0.05):
+        self.distance = distance
+        self.entries = {}
+        self.queries = []
+
+    def count(self):
+        return len(self.entries)
+
+    def upsert(self, ids, documents, metadatas):
+        for entry_id, document, metadata in zip(ids, documents, metadatas):
+            self.entries[entry_id] = (document, metadata)
+
+    def query(self, query_texts, n_results, where):
+        self.queries.append((query_texts, where))
+        conditions = {key: value for cond in where["$and"] for key, value in cond.items()}
+        hits = [
+            (entry_id, metadata) for entry_id, (_, metadata) in self.entries.items()
+            if all(metadata[key] == value for key, value in conditions.items())
+        ][:n_results]
+        return {
+            "ids": [[entry_id for entry_id, _ in hits]],
+            "distances": [[self.distance for _ in hits]],
+            "metadatas": [[metadata for _, metadata in hits]],
+        }
+
+
+@pytest.fixture
+def semantic(monkeypatch):
+    monkeypatch.setenv("OMNI_SEMANTIC_CACHE", "1")
+    cache = SemanticPlanCache(path="unused", threshold=0.9)
+    cache._collection = FakeCollection()
+    return cache
+
+
+class TestSemanticPlanCache:
+    def test_import_does_not_load_chromadb(self):
+        core_dir = Path(llm_cache.__file__).parent
+        code = "import sys, llm_cache; sys.exit('chromadb' in sys.modules)"
+        assert subprocess.run([sys.executable, "-c", code], cwd=core_dir).returncode == 0
+
+    def test_disabled_by_default(self, monkeypatch):
+        monkeypatch.delenv("OMNI_SEMANTIC_CACHE", raising=False)
+        cache = SemanticPlanCache(path="unused")
+        cache.add("ImportError: x", "quick", ["Next.js"], "{}")
+        assert cache.lookup("ImportError: x", "quick", ["Next.js"]) is None
+        assert cache._collection is None
+
+    def test_round_trip_scoped_to_strategy_and_stack(self, semantic):
+        semantic.add("No module named 'foo'", "quick", ["FastAPI", "Python"], '{"fixes": []}')
+        assert semantic.lookup("No module named 'foo'", "quick", ["python", "fastapi"]) == '{"fixes": []}'
+        assert semantic.lookup("No module named 'foo'", "logic", ["python", "fastapi"]) is None
+        assert semantic.lookup("No module named 'foo'", "quick", ["Next.js"]) is None
+
+    def test_rejects_matches_below_threshold(self, semantic):
+        semantic.add("No module named 'foo'", "quick", ["Python"], "{}")
+        semantic._collection.distance = 0.2
+        assert semantic.lookup("No module named 'foo'", "quick", ["Python"]) is None
+
+    def test_same_error_upserts_one_entry(self, semantic):
+        semantic.add("Error at /tmp/a/src/app.py", "quick", ["Python"], "old")
+        semantic.add("Error at /tmp/b/src/app.py", "quick", ["Python"], "new")
+        assert semantic._collection.count() == 1
+        assert semantic.lookup("Error at /tmp/c/src/app.py", "quick", ["Python"]) == "new"
@@ -0,0 +1,70 @@
+"""Unit tests for the async token bucket (fake clock; no real waiting)."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import rate_limiter
+from rate_limiter import AsyncTokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Pins rate_limiter's monotonic clock; its sleeps advance the clock instead of waiting."""
+    now = [100.0]
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+        now[0] += delay
+        await asyncio.sleep(0)  # Still yield, so other waiters get scheduled
+
+    # Only rate_limiter's views of time/asyncio are replaced; the real modules
+    # (and the event loop, which shares them) are left alone
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    monkeypatch.setattr(rate_limiter, "asyncio", SimpleNamespace(sleep=fake_sleep, Lock=asyncio.Lock))
+    return SimpleNamespace(now=now, sleeps=sleeps)
+
+
+class TestAsyncTokenBucket:
+    async def test_burst_up_to_capacity_then_waits(self, clock):
+        bucket = AsyncTokenBucket(rate=60, period=60.0)
+        for _ in range(60):
+            await bucket.acquire()
+        assert clock.sleeps == []
+
+        await bucket.acquire()
+        assert clock.sleeps == [pytest.approx(1.0)]
+
+    async def test_refills_with_elapsed_time_up_to_capacity(self, clock):
+        bucket = AsyncTokenBucket(rate=60, period=60.0)
+        await bucket.acquire(60)
+
+        clock.now[0] += 30
+        await bucket.acquire(30)
+        assert clock.sleeps == []
+
+        clock.now[0] += 3600
+        bucket._refill()
+        assert bucket._tokens == 60
+
+    async def test_oversized_request_is_clamped_to_capacity(self, clock):
+        bucket = AsyncTokenBucket(rate=10, period=10.0)
+        await bucket.acquire(4)
+
+        await bucket.acquire(1000)  # Waits for a full bucket, not forever
+        assert clock.sleeps == [pytest.approx(4.0)]
+        assert bucket._tokens == pytest.approx(0)
+
+    async def test_waiters_are_served_in_fifo_order(self, clock):
+        bucket = AsyncTokenBucket(rate=1, period=1.0)
+        await bucket.acquire()
+        served = []
+
+        async def waiter(name):
+            await bucket.acquire()
+            served.append(name)
+
+        await asyncio.gather(*(waiter(name) for name in ("first", "second", "third")))
+        assert served == ["first", "second", "third"]
+        assert clock.sleeps == [pytest.approx(1.0)] * 3
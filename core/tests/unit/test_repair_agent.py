@@ -0,0 +1,228 @@
+"""Unit tests for RepairAgent helpers (no LLM calls)."""
+import asyncio
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import repair_agent
+from repair_agent import RepairAgent
+
+
+@pytest.fixture
+def agent():
+    return RepairAgent(Mock(), Mock())
+
+
+LONG_TRACEBACK = "\n".join(
+    ["\x1b[31mTraceback (most recent call last):\x1b[0m"]
+    + [f'  File "/work/proj/src/mod{i}.py", line {i}, in func{i}\n    call_{i}()' for i in range(60)]
+    + ["ValueError: the final exception line"]
+)
+
+
+class TestErrorExcerpt:
+    def test_canonicalize_strips_ansi_and_relativizes_paths(self, agent):
+        agent._project_root = "/work/proj"
+        out = agent._canonicalize_output(LONG_TRACEBACK)
+        assert "\x1b[" not in out
+        assert "/work/proj/" not in out
+        assert 'File "src/mod59.py"' in out
+
+    def test_canonicalize_keeps_last_lines(self, agent):
+        out = agent._canonicalize_output(LONG_TRACEBACK).splitlines()
+        assert len(out) == repair_agent._EXCERPT_MAX_LINES
+        assert out[-1] == "ValueError: the final exception line"
+
+    def test_canonicalize_collapses_repeats(self, agent):
+        text = "\n".join(["frame a", "frame b"] * 5 + ["same"] * 4 + ["end"])
+        out = agent._canonicalize_output(text).splitlines()
+        assert out == [
+            "frame a",
+            "frame b",
+            "[previous 2 line(s) repeated 4 more times]",
+            "same",
+            "[previous 1 line(s) repeated 3 more times]",
+            "end",
+        ]
+
+    def test_excerpt_keeps_final_exception_line(self, agent):
+        error = {"stderr": LONG_TRACEBACK}
+        excerpt = agent._error_excerpt(error, "stderr")
+        assert len(excerpt) <= repair_agent._ERROR_EXCERPT_CHARS
+        assert excerpt.endswith("ValueError: the final exception line")
+        assert agent._error_excerpt(error, "stderr") is excerpt
+
+
+def _stream(*deltas):
+    """Fake litellm stream yielding the given content deltas."""
+    async def gen():
+        for delta in deltas:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+    return gen()
+
+
+class TestStreamFixPlan:
+    async def test_accepts_plan_with_other_first_key(self, agent, monkeypatch):
+        stream = _stream('{"analysis": "missing import", ', '"fixes": [{"file_path": "a.py"}]}')
+        monkeypatch.setattr(repair_agent.litellm, "acompletion", AsyncMock(return_value=stream))
+        text = await agent._stream_fix_plan([])
+        assert text == '{"analysis": "missing import", "fixes": [{"file_path": "a.py"}]}'
+
+    async def test_aborts_on_prose(self, agent, monkeypatch):
+        stream = _stream("Sure! Here is", " the fix: {}")
+        monkeypatch.setattr(repair_agent.litellm, "acompletion", AsyncMock(return_value=stream))
+        assert await agent._stream_fix_plan([]) is None
+
+
+class TestRunCommands:
+    def test_coalesce_merges_consecutive_installs(self):
+        merged = RepairAgent._coalesce_commands(
+            ["pip install a", "pip install b 'c>=1'", "npm install x", "echo hi && ls"]
+        )
+        assert merged == [
+            ("pip install a b 'c>=1'", ["pip install a", "pip install b 'c>=1'"]),
+            ("npm install x", ["npm install x"]),
+            ("echo hi && ls", ["echo hi && ls"]),
+        ]
+
+    async def test_failed_merged_install_is_retried_one_by_one(self, agent, monkeypatch):
+        ran = []
+        async def fake_run(cmd, cwd):
+            ran.append(cmd)
+            return "bogus" not in cmd
+        monkeypatch.setattr(agent, "_run_command", fake_run)
+        await agent._run_commands(["pip install a", "pip install bogus", "pip install b"], ".")
+        assert ran == [
+            "pip install a bogus b",
+            "pip install a",
+            "pip install bogus",
+            "pip install b",
+        ]
+
+    async def test_successful_merged_install_runs_once(self, agent, monkeypatch):
+        run = AsyncMock(return_value=True)
+        monkeypatch.setattr(agent, "_run_command", run)
+        await agent._run_commands(["pip install a", "pip install b"], ".")
+        run.assert_awaited_once_with("pip install a b", ".")
+
+
+class TestAnalyzeDependencies:
+    def test_no_findings(self, agent):
+        files = {"package.json": {"dependencies": {"react": "^18.2.0", "react-dom": "^18.2.0"}}}
+        assert agent._analyze_dependencies(files) == "No dependency conflicts detected."
+
+    def test_flags_conflicts_and_undeclared_imports(self, agent):
+        files = {
+            "package.json": {
+                "dependencies": {"react": "^18.2.0", "react-dom": "^17.0.0", "zod": "^3.0.0"},
+                "devDependencies": {"zod": "^2.0.0"},
+            },
+            "requirements.txt": "fastapi==0.110\nFastAPI>=0.100\n# comment\n-e .\n",
+        }
+        stderr = (
+            "Error: Cannot find module 'lodash/merge'\n"
+            "ModuleNotFoundError: No module named 'yaml'\n"
+            "Cannot find module './local'\n"
+        )
+        findings = agent._analyze_dependencies(files, stderr).splitlines()
+        assert "- zod is declared twice with different versions (^3.0.0 vs ^2.0.0)" in findings
+        assert any(f.startswith("- react-dom ^17.0.0 does not match react ^18.2.0") for f in findings)
+        assert any(f.startswith("- requirements.txt pins fastapi twice") for f in findings)
+        assert "- 'lodash' is imported but not declared in any manifest" in findings
+        assert "- 'yaml' is imported but not declared in any manifest" in findings
+        assert not any("local" in f for f in findings)
+
+    @pytest.mark.parametrize("section", [["react"], "react@18", None, 3])
+    def test_malformed_sections_are_skipped(self, agent, section):
+        files = {"package.json": {"dependencies": section, "devDependencies": {"vitest": "^1.0.0"}}}
+        assert agent._analyze_dependencies(files) == "No dependency conflicts detected."
+
+    async def test_quick_fix_prompt_includes_analysis(self, agent, monkeypatch):
+        files = {"package.json": {"dependencies": ["react"]}}
+        monkeypatch.setattr(agent, "_read_critical_files", AsyncMock(return_value=files))
+        call_llm = AsyncMock(return_value=None)
+        monkeypatch.setattr(agent, "_call_llm", call_llm)
+        spec = SimpleNamespace(project_name="demo", tech_stack=["Next.js"], core_features=[])
+        error = {"command": "npm test", "exit_code": 1, "stderr": "Cannot find module 'lodash'"}
+
+        await agent._strategy_quick_fixes(".", spec, error)
+
+        user_prompt = call_llm.await_args.args[2]
+        assert "Command: npm test" in user_prompt
+        assert "Dependency analysis:\n- 'lodash' is imported but not declared in any manifest" in user_prompt
+
+
+class TestRepair:
+    async def test_unused_speculative_plans_are_cancelled_and_awaited(self, agent, monkeypatch):
+        started = []
+        async def fixing_strategy(target_dir, spec, error):
+            return {"fixes": [{"file_path": "a.py", "new_content": "fixed"}]}
+        async def slow_strategy(target_dir, spec, error):
+            task = asyncio.current_task()
+            started.append(task)
+            await asyncio.sleep(60)
+        agent.strategies = [
+            ("Fix", fixing_strategy), ("Slow 1", slow_strategy), ("Slow 2", slow_strategy)
+        ]
+        agent.arbiter.verify_and_refine = Mock(return_value={"status": "success"})
+        monkeypatch.setattr(agent, "_lookup_pattern", Mock(return_value=None))
+        monkeypatch.setattr(agent, "_lookup_semantic_plan", AsyncMock(return_value=None))
+        spec = SimpleNamespace(project_name="demo", tech_stack=["Python"], core_features=[])
+
+        result = await agent.repair(".", spec, {"stderr": ""})
+
+        assert result["status"] == "success"
+        assert result["strategy_used"] == "Fix"
+        assert len(started) == 2
+        assert all(task.done() and task.cancelled() for task in started)
+
+    async def test_speculative_plan_applies_to_restored_files(self, agent, monkeypatch, tmp_path):
+        (tmp_path / "app.py").write_text("original")
+        def plan(*files):
+            async def strategy(target_dir, spec, error):
+                return {"fixes": [{"file_path": f, "new_content": "changed"} for f in files]}
+            return strategy
+        agent.strategies = [
+            ("First", plan("app.py", "new.py")), ("Second", plan("other.py")), ("Third", plan("app.py"))
+        ]
+        seen = []
+        def apply_fix(fix_result):
+            seen.append(((tmp_path / "app.py").read_text(), (tmp_path / "new.py").exists()))
+            for fix in fix_result["fixes"]:
+                (tmp_path / fix["file_path"]).write_text(fix["new_content"])
+        agent.swarm.apply_fix = Mock(side_effect=apply_fix)
+        agent.arbiter.verify_and_refine = Mock(side_effect=[
+            {"status": "failed", "stderr": "still broken"},
+            {"status": "failed", "stderr": "still broken"},
+            {"status": "success"},
+        ])
+        monkeypatch.setattr(agent, "_lookup_pattern", Mock(return_value=None))
+        monkeypatch.setattr(agent, "_lookup_semantic_plan", AsyncMock(return_value=None))
+        spec = SimpleNamespace(project_name="demo", tech_stack=["Python"], core_features=[])
+
+        result = await agent.repair(str(tmp_path), spec, {"stderr": ""})
+
+        assert result["strategy_used"] == "Third"
+        # Every speculative plan saw the initial files, not the earlier strategies' edits
+        assert seen == [("original", False)] * 3
+        assert (tmp_path / "app.py").read_text() == "changed"
+        assert not (tmp_path / "other.py").exists()
+
+
+class TestExtractFailingFile:
+    def test_long_traceback_returns_innermost_frame(self, agent):
+        frames = "\n".join(
+            f'  File "/proj/pkg/module_{i:03d}.py", line {i}, in f{i}\n    f{i + 1}()'
+            for i in range(200)
+        )
+        stderr = f"Traceback (most recent call last):\n{frames}\nKeyError: 'x'"
+        assert len(stderr) > repair_agent._STDERR_TAIL_CHARS
+        assert agent._extract_failing_file({"stderr": stderr}) == "/proj/pkg/module_199.py"
+
+    def test_error_in_uses_last_match(self, agent):
+        stderr = "Error in tests/test_a.py\n" + "x" * 5000 + "\nError in tests/test_b.py\nFailed: tests/test_c.py"
+        assert agent._extract_failing_file({"stderr": stderr}) == "tests/test_c.py"
+
+    def test_defaults_to_conftest(self, agent):
+        assert agent._extract_failing_file({"stderr": "boom"}) == "tests/conftest.py"
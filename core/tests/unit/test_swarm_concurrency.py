@@ -2,13 +2,25 @@
 import pytest
 import asyncio
 import os
-from unittest.mock import Mock
+import shutil
+from unittest.mock import AsyncMock, Mock
 from pathlib import Path
-import sys
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from types import SimpleNamespace
+import swarm
 from swarm import SwarmAgent
 from cortex import Task, ProjectSpec
 
+@pytest.fixture
+def fake_mem(monkeypatch):
+    """Returns a setter that makes SwarmAgent see the given RAM via psutil (no cgroup cap)."""
+    monkeypatch.setattr(swarm, "_proc_meminfo", lambda: None)
+    monkeypatch.setattr(swarm, "_cgroup_memory", lambda: None)
+    def set_mem(available_gb, percent=50):
+        mem = SimpleNamespace(available=int(available_gb * 1024 ** 3), percent=percent)
+        monkeypatch.setattr(swarm.psutil, "virtual_memory", lambda: mem)
+        monkeypatch.setattr(swarm, "_latest_memory_sample", None)
+    return set_mem
+
 class TestAdaptiveConcurrency:
     def test_agent_has_concurrency_limit(self):
         """Test SwarmAgent initializes with concurrency limit."""
@@ -16,25 +28,153 @@ class TestAdaptiveConcurrency:
         assert hasattr(agent, 'max_concurrent_tasks')
         assert 1 <= agent.max_concurrent_tasks <= 10
 
+    @pytest.mark.parametrize("gb,pct,env,expected", [
+        (1.5, 50, "auto", 1),
+        (3.5, 50, "auto", 2),
+        (5.5, 50, "auto", 4),
+        (7.0, 50, "auto", 6),
+        (10.0, 50, "auto", 6),
+        (16.0, 50, "auto", 8),
+        (10.0, 50, "3", 3),
+        (10.0, 50, "11", 6),
+        (10.0, 50, "lots", 6),
+    ])
+    def test_concurrency(self, fake_mem, monkeypatch, gb, pct, env, expected):
+        """Test concurrency tiers by available RAM and the env override."""
+        monkeypatch.setenv("OMNI_MAX_CONCURRENT_TASKS", env)
+        fake_mem(gb, pct)
+        agent = SwarmAgent()
+        assert agent.max_concurrent_tasks == expected
+
     def test_semaphore_exists(self):
         """Test semaphore is created."""
         agent = SwarmAgent()
-        assert isinstance(agent.semaphore, asyncio.Semaphore)
+        assert isinstance(agent.semaphore, asyncio.BoundedSemaphore)
+
+    async def test_semaphore_is_created_with_correct_limit(self):
+        """Test semaphore admits exactly max_concurrent_tasks holders."""
+        agent = SwarmAgent()
+        for _ in range(agent.max_concurrent_tasks):
+            await asyncio.wait_for(agent.semaphore.acquire(), timeout=1)
+        assert agent.semaphore.locked()
+        for _ in range(agent.max_concurrent_tasks):
+            agent.semaphore.release()
+        with pytest.raises(ValueError):
+            agent.semaphore.release()
 
     @pytest.mark.asyncio
     async def test_semaphore_limits_execution(self):
         """Test semaphore actually limits concurrent tasks."""
         agent = SwarmAgent()
-        max_concurrent = []
+        max_concurrent = [0]
         current = [0]
+        reached = asyncio.Event()
         async def tracked_task():
             async with agent.semaphore:
                 current[0] += 1
-                max_concurrent.append(current[0])
-                await asyncio.sleep(0.05)
+                max_concurrent[0] = max(max_concurrent[0], current[0])
+                if current[0] >= agent.max_concurrent_tasks:
+                    reached.set()
+                await reached.wait()
                 current[0] -= 1
-        await asyncio.gather(*[tracked_task() for _ in range(agent.max_concurrent_tasks * 2)])
-        assert max(max_concurrent) <= agent.max_concurrent_tasks
+        await asyncio.wait_for(
+            asyncio.gather(*[tracked_task() for _ in range(agent.max_concurrent_tasks * 2)]),
+            timeout=5
+        )
+        assert max_concurrent[0] == agent.max_concurrent_tasks
+
+class TestMemoryMonitoring:
+    async def test_pauses_when_memory_high(self, fake_mem, monkeypatch):
+        """Test task start waits for a cooldown above the high-memory threshold."""
+        fake_mem(10.0, 90)
+        monkeypatch.setattr(swarm, "_COOLDOWN_POLL_SECONDS", 0)  # No restart jitter
+        agent = SwarmAgent()
+        agent._execute_task = AsyncMock(return_value=None)
+        agent._cool_down = AsyncMock(return_value=None)
+        await agent._execute_task_with_safety(Mock(), Mock(), Path("."), Mock())
+        agent._cool_down.assert_awaited_once()
+        agent._execute_task.assert_awaited_once()
+
+    async def test_continues_when_memory_ok(self, fake_mem):
+        """Test task starts immediately when memory usage is normal."""
+        fake_mem(10.0, 50)
+        agent = SwarmAgent()
+        agent._execute_task = AsyncMock(return_value=None)
+        agent._cool_down = AsyncMock(return_value=None)
+        await agent._execute_task_with_safety(Mock(), Mock(), Path("."), Mock())
+        agent._cool_down.assert_not_awaited()
+        agent._execute_task.assert_awaited_once()
+
+    async def test_cool_down_returns_once_memory_recovers(self, fake_mem, monkeypatch):
+        """Test the cooldown polls until usage drops below the resume threshold."""
+        fake_mem(10.0, 90)
+        monkeypatch.setattr(swarm, "_COOLDOWN_POLL_SECONDS", 0)
+        agent = SwarmAgent()
+        # Each poll sees the next reading; 82% is still above the resume threshold
+        samples = iter([82, 70])
+        real_sample = swarm._sample_memory
+        def sample(max_age=0):
+            fake_mem(10.0, next(samples))
+            return real_sample(max_age=0)
+        monkeypatch.setattr(swarm, "_sample_memory", sample)
+        await asyncio.wait_for(agent._cool_down(), timeout=1)
+        assert next(samples, None) is None
+
+def _plan(*deps):
+    """Execution plan from (task_id, depends_on) pairs."""
+    return [
+        Task(task_id=task_id, task_description=task_id, output_files=[], depends_on=list(depends_on))
+        for task_id, depends_on in deps
+    ]
+
+class TestBuildSchedule:
+    def test_valid_plan(self):
+        agent = SwarmAgent()
+        plan = _plan(("a", []), ("b", ["a"]), ("c", ["a", "b"]))
+        plan_order, unmet_deps, dependents = agent._build_schedule(plan)
+        assert plan_order == {"a": 0, "b": 1, "c": 2}
+        assert unmet_deps == {"a": 0, "b": 1, "c": 2}
+        assert [t.task_id for t in dependents["a"]] == ["b", "c"]
+
+    def test_cycle_raises(self):
+        agent = SwarmAgent()
+        plan = _plan(("a", []), ("b", ["c"]), ("c", ["b"]))
+        with pytest.raises(swarm.InvalidExecutionPlan, match=r"\['b', 'c'\]"):
+            agent._build_schedule(plan)
+
+    def test_unknown_dependency_raises(self):
+        agent = SwarmAgent()
+        plan = _plan(("a", []), ("b", ["missing"]))
+        with pytest.raises(swarm.InvalidExecutionPlan, match=r"\['b'\]"):
+            agent._build_schedule(plan)
+
+    async def test_construct_rejects_cycle_before_setup(self, tmp_path):
+        memory_agent = Mock(a_init=AsyncMock())
+        agent = SwarmAgent(memory_agent=memory_agent)
+        spec = ProjectSpec(
+            project_name="demo", tech_stack=["Python"], database_schema="",
+            core_features=[], execution_plan=_plan(("a", ["b"]), ("b", ["a"])),
+        )
+        with pytest.raises(swarm.InvalidExecutionPlan):
+            await agent.construct(spec, target_dir=str(tmp_path / "demo"))
+        memory_agent.a_init.assert_not_awaited()
+        assert not any((tmp_path / "demo").iterdir())
+
+class TestWriteFile:
+    def test_recreates_directory_deleted_after_caching(self, tmp_path):
+        agent = SwarmAgent()
+        agent._write_file(tmp_path, "dist/a.js", "a")
+        shutil.rmtree(tmp_path / "dist")
+        agent._write_file(tmp_path, "dist/b.js", "b")
+        assert (tmp_path / "dist" / "b.js").read_text() == "b"
+
+    def test_apply_fix_recreates_deleted_directory(self, tmp_path):
+        agent = SwarmAgent()
+        agent.target_dir = str(tmp_path)
+        agent._write_file(tmp_path, "src/app.py", "old")
+        shutil.rmtree(tmp_path / "src")
+        agent.apply_fix({"fixes": [{"file_path": "src/app.py", "new_content": "new"}]})
+        assert (tmp_path / "src" / "app.py").read_text() == "new"
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])